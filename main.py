@@ -1,89 +1,316 @@
+import argparse
+import ast
 import sys
-from typing import Any, Dict, List, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 
+from snake.benchmark import BENCHMARK_SIZES, compare_results, format_results, load_results, run_benchmarks, save_results
 from snake.game import SnakeGame
+from snake.kernels import BACKENDS
+from snake.profiling import instrument, profile_run
+from snake.render import TerminalRenderer
+from snake.replay import ReplayArchive, Replayer, write_record
+from snake.simulation import expand_grid, run_batch
 from snake.solutions.base import BaseSolution
+from snake.solutions.dynamic_cycle import DynamicCycleSolution
 from snake.solutions.greedy import GreedySolution
+from snake.solutions.mcts import MCTSSolution
+from snake.solutions.observers import RenderObserver
 from snake.solutions.random import RandomSolution
 from snake.solutions.shortest_path import ShortestPathSolution
 from snake.solutions.trivial import TrivialSolution
+from snake.stats import GameStats, ProgressReporter
+from snake.tuning import pareto_front, successive_halving, write_results
 
 RUN_SIMULATIONS = 1
 SIZE = 10, 10
 TO_PRINT = True
 FRAME_PERIOD = 0.05
 
+SOLUTIONS: Dict[str, Tuple[Type[BaseSolution], Dict[str, Any]]] = {
+    "trivial": (TrivialSolution, {}),
+    "random": (
+        RandomSolution,
+        {
+            "room_left": 0,
+            "length_cutoff": 0.5,
+        },
+    ),
+    "greedy": (
+        GreedySolution,
+        {
+            "room_left": 0,
+            "shortcut_gain_cutoff": 2,
+            "length_cutoff": 0.5,
+        },
+    ),
+    "shortest_path": (
+        ShortestPathSolution,
+        {
+            "length_cutoff": 0.6,
+        },
+    ),
+    "dynamic_cycle": (DynamicCycleSolution, {}),
+    "mcts": (MCTSSolution, {"time_budget_ms": 5.0}),
+}
+# SOLUTIONS THAT SPEND A FIXED TIME PER MOVE, LEFT OUT OF THE DEFAULT BENCHMARK WHERE THEY WOULD ONLY TIME THE BUDGET
+TIME_BUDGETED = {"mcts"}
 
-def run_simulations(solution_class: Type[BaseSolution], params_list: List[Dict[str, Any]]) -> None:
-    scores = []
-    move_counts = []
+
+def run_simulations(
+    solution_class: Type[BaseSolution],
+    params_list: List[Dict[str, Any]],
+    renderer: Optional[TerminalRenderer] = None,
+    step_period: float = FRAME_PERIOD,
+) -> None:
+    stats = GameStats(SIZE)
     for i in range(RUN_SIMULATIONS):
-        game = SnakeGame(SIZE[0], SIZE[1])
+        game = SnakeGame(SIZE[0], SIZE[1], seed=i)
 
         # RUN SOLUTION
         params = params_list[i]
-        solution = solution_class(game=game, to_print=TO_PRINT, frame_period=FRAME_PERIOD, **params)
+        # step_period PACES EITHER OUTPUT, THE CONSOLE ONE THROUGH frame_period
+        if renderer is None:
+            solution = solution_class(game=game, to_print=TO_PRINT, frame_period=step_period, **params)
+        else:
+            solution = solution_class(game=game, to_print=False, frame_period=step_period, **params)
+            solution.subscribe(RenderObserver(renderer, step_period))
         game = solution.run()
 
         # RETREIVE METRICS
-        scores.append(game.length)
-        move_counts.append(game.move_count)
+        stats.add(game.length, game.move_count, game.length == game.max_length)
 
-    print(
-        "Average score: {} - Average move count: {}".format(
-            sum(scores) / RUN_SIMULATIONS,
-            sum(move_counts) / RUN_SIMULATIONS,
-        )
+    print(stats.summary())
+
+
+def parse_grid(items: List[str]) -> Dict[str, List[Any]]:
+    # "room_left=0,1,2" -> {"room_left": [0, 1, 2]}
+    grid = {}
+    for item in items:
+        key, _, values = item.partition("=")
+        grid[key] = [ast.literal_eval(value) for value in values.split(",")]
+    return grid
+
+
+def run_batch_command(args: argparse.Namespace) -> None:
+    solution_class, base_params = SOLUTIONS[args.solution]
+    params_list = expand_grid(base_params, parse_grid(args.param))
+    size = (args.size[0], args.size[1])
+    seeds = range(args.seed, args.seed + args.games)
+
+    results = run_batch(
+        solution_class,
+        params_list,
+        size,
+        seeds,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        record=args.record is not None,
     )
-    print(
-        "Percenrage of perfect game {}".format(
-            len([score for score in scores if score == SIZE[0] * SIZE[1] - 1]) / RUN_SIMULATIONS
+    record_file = open(args.record, "ab") if args.record is not None else None
+    per_params = [GameStats(size) for _ in params_list]
+    total = GameStats(size)
+    # LIVE PROGRESS ONLY ON A TERMINAL AND WHEN EVERY GAME IS NOT PRINTED ANYWAY
+    progress = ProgressReporter(len(params_list) * len(seeds)) if sys.stderr.isatty() and not args.verbose else None
+    for result in results:
+        per_params[result.params_index].add(result.score, result.move_count, result.perfect, result.wall_time)
+        total.add(result.score, result.move_count, result.perfect, result.wall_time)
+        if record_file is not None:
+            write_record(record_file, size[0], size[1], result.seed, result.move_count, result.moves)
+        if progress is not None:
+            progress.update(total)
+        if args.verbose:
+            print(
+                "params {} - seed {} - score {} - move count {} - {:.3f}s{}".format(
+                    result.params_index,
+                    result.seed,
+                    result.score,
+                    result.move_count,
+                    result.wall_time,
+                    " - perfect" if result.perfect else "",
+                )
+            )
+
+    if progress is not None:
+        progress.finish()
+    if record_file is not None:
+        record_file.close()
+
+    for params, params_stats in zip(params_list, per_params):
+        print(params)
+        print(params_stats.summary())
+
+
+def run_profile_command(args: argparse.Namespace) -> None:
+    solution_class, params = SOLUTIONS[args.solution]
+    game = SnakeGame(args.size[0], args.size[1], seed=args.seed)
+    solution = solution_class(game=game, to_print=False, frame_period=0, **params)
+
+    if args.pstats is not None:
+        stats = profile_run(solution, args.pstats)
+        stats.sort_stats("cumulative").print_stats(args.top)
+    else:
+        timer = instrument(solution)
+        game = solution.run()
+        print(timer.summary())
+
+    print("Score: {} - Move count: {}".format(game.length, game.move_count))
+
+
+def run_benchmark_command(args: argparse.Namespace) -> None:
+    solutions = {name: SOLUTIONS[name] for name in args.solutions}
+    sizes = [(int(w), int(h)) for w, h in (size.split("x") for size in args.sizes)]
+    results = run_benchmarks(solutions, sizes, max_moves=args.max_moves, repeat=args.repeat, backend=args.backend)
+    print(format_results(results))
+
+    if args.save is not None:
+        save_results(results, args.save)
+
+    if args.compare is not None:
+        regressions = compare_results(results, load_results(args.compare), args.threshold)
+        for regression in regressions:
+            print("REGRESSION", regression)
+        if regressions:
+            sys.exit(1)
+
+
+def run_replay_command(args: argparse.Namespace) -> None:
+    with ReplayArchive(args.file) as archive:
+        print("{} games in {}".format(len(archive), args.file))
+        if len(archive) == 0:
+            return
+        replay = archive[args.game]
+        print(
+            "Game {} - {}x{} - seed {} - {} moves".format(
+                args.game, replay.width, replay.height, replay.seed, replay.n_moves
+            )
         )
+        replayer = Replayer(replay)
+        game = replayer.seek(replay.n_moves if args.move is None else args.move)
+        game.display()
+        print("Move {} - Length {}".format(game.move_count, game.length))
+
+
+def run_watch_command(args: argparse.Namespace) -> None:
+    solution_class, params = SOLUTIONS[args.solution]
+    renderer = None
+    if args.render != "console":
+        renderer = TerminalRenderer(ansi=args.render == "ansi", fps=args.fps)
+    run_simulations(solution_class, [params for _ in range(RUN_SIMULATIONS)], renderer, args.step_period)
+
+
+def run_tune_command(args: argparse.Namespace) -> None:
+    solution_class, base_params = SOLUTIONS[args.solution]
+    params_list = expand_grid(base_params, parse_grid(args.param))
+    seeds = list(range(args.seed, args.seed + args.games))
+
+    results = successive_halving(
+        solution_class,
+        params_list,
+        (args.size[0], args.size[1]),
+        seeds,
+        min_games=args.min_games,
+        eta=args.eta,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        verbose=True,
     )
 
-    print(scores)
+    final_rung = max(result.rung for result in results)
+    print("Pareto front (perfect rate against average move count) on {} seeds:".format(len(seeds)))
+    for result in pareto_front([result for result in results if result.rung == final_rung]):
+        print(
+            "perfect {:.3f} - average move count {:.1f} - {}".format(
+                result.perfect_rate, result.mean_moves, result.params
+            )
+        )
+    if args.output is not None:
+        write_results(results, args.output)
 
 
 def main():
-    # TRIVIAL SOLUTION
-    if sys.argv[-1] == "trivial":
-        param_list = [{} for _ in range(RUN_SIMULATIONS)]
-        run_simulations(TrivialSolution, param_list)
-
-    # RANDOM SOLUTION
-    elif sys.argv[-1] == "random":
-        param_list = [
-            {
-                "room_left": 0,
-                "length_cutoff": 0.5,
-            }
-            for _ in range(RUN_SIMULATIONS)
-        ]
-        run_simulations(RandomSolution, param_list)
-
-    # GREEDY SOLUTION
-    elif sys.argv[-1] == "greedy":
-        param_list = [
-            {
-                "room_left": 0,
-                "shortcut_gain_cutoff": 2,
-                "length_cutoff": 0.5,
-            }
-            for _ in range(RUN_SIMULATIONS)
-        ]
-        run_simulations(GreedySolution, param_list)
-
-    # SHORTEST PATH SOLUTION
-    elif sys.argv[-1] == "shortest_path":
-        param_list = [
-            {
-                "length_cutoff": 0.6,
-            }
-            for _ in range(RUN_SIMULATIONS)
-        ]
-        run_simulations(ShortestPathSolution, param_list)
-    else:
-        raise ValueError("Must supply correct argument")
+    parser = argparse.ArgumentParser(description="Run snake solutions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    watch_parser = subparsers.add_parser("watch", help="play and display games one after another")
+    watch_parser.add_argument("solution", choices=SOLUTIONS.keys())
+    watch_parser.add_argument(
+        "--render",
+        choices=["console", "ansi", "plain"],
+        default="console",
+        help="console prints the debug output, ansi repaints changed cells in place, plain writes whole frames",
+    )
+    watch_parser.add_argument("--fps", type=float, default=None, help="target frame rate of ansi and plain")
+    watch_parser.add_argument("--step-period", type=float, default=FRAME_PERIOD, help="seconds between moves")
+    watch_parser.set_defaults(func=run_watch_command)
+
+    batch_parser = subparsers.add_parser("batch", help="play headless games in parallel across cores")
+    batch_parser.add_argument("solution", choices=SOLUTIONS.keys())
+    batch_parser.add_argument("--games", type=int, default=100, help="number of seeds per parameter set")
+    batch_parser.add_argument("--seed", type=int, default=0, help="first seed")
+    batch_parser.add_argument("--size", type=int, nargs=2, default=list(SIZE), metavar=("WIDTH", "HEIGHT"))
+    batch_parser.add_argument("--workers", type=int, default=None, help="defaults to the number of cores")
+    batch_parser.add_argument("--chunksize", type=int, default=None, help="games per task sent to a worker")
+    batch_parser.add_argument(
+        "--param", action="append", default=[], help="parameter grid entry like room_left=0,1,2, can be repeated"
+    )
+    batch_parser.add_argument("--verbose", action="store_true", help="print every game as it completes")
+    batch_parser.add_argument("--record", default=None, help="append every game to this replay file")
+    batch_parser.set_defaults(func=run_batch_command)
+
+    tune_parser = subparsers.add_parser("tune", help="search a parameter grid with successive halving")
+    tune_parser.add_argument("solution", choices=SOLUTIONS.keys())
+    tune_parser.add_argument(
+        "--param", action="append", default=[], help="parameter grid entry like room_left=0,1,2, can be repeated"
+    )
+    tune_parser.add_argument("--games", type=int, default=64, help="seeds played by the candidates that survive")
+    tune_parser.add_argument("--seed", type=int, default=0, help="first seed")
+    tune_parser.add_argument("--size", type=int, nargs=2, default=list(SIZE), metavar=("WIDTH", "HEIGHT"))
+    tune_parser.add_argument("--min-games", type=int, default=4, help="seeds every candidate plays before a cut")
+    tune_parser.add_argument("--eta", type=int, default=2, help="keep 1/eta of the candidates at every cut")
+    tune_parser.add_argument("--workers", type=int, default=None, help="defaults to the number of cores")
+    tune_parser.add_argument("--chunksize", type=int, default=None, help="games per task sent to a worker")
+    tune_parser.add_argument("--output", default=None, help="write every candidate to this .csv or .parquet file")
+    tune_parser.set_defaults(func=run_tune_command)
+
+    profile_parser = subparsers.add_parser("profile", help="time the phases of a single headless game")
+    profile_parser.add_argument("solution", choices=SOLUTIONS.keys())
+    profile_parser.add_argument("--seed", type=int, default=0)
+    profile_parser.add_argument("--size", type=int, nargs=2, default=list(SIZE), metavar=("WIDTH", "HEIGHT"))
+    profile_parser.add_argument("--pstats", default=None, help="run under cProfile and dump the stats to this file")
+    profile_parser.add_argument("--top", type=int, default=20, help="number of cProfile entries to print")
+    profile_parser.set_defaults(func=run_profile_command)
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="time the solutions and the hot loops")
+    benchmark_parser.add_argument(
+        "--solutions",
+        nargs="+",
+        choices=SOLUTIONS.keys(),
+        default=[name for name in SOLUTIONS if name not in TIME_BUDGETED],
+    )
+    benchmark_parser.add_argument(
+        "--sizes", nargs="+", default=["{}x{}".format(w, h) for w, h in BENCHMARK_SIZES], help="board sizes like 8x8"
+    )
+    benchmark_parser.add_argument("--max-moves", type=int, default=20000, help="moves after which a game is cut")
+    benchmark_parser.add_argument("--repeat", type=int, default=5, help="repeats of each micro benchmark")
+    benchmark_parser.add_argument(
+        "--backend",
+        choices=[*BACKENDS, "auto"],
+        default="python",
+        help="kernels of batch_step, path_plan and path planning solutions, auto picks numba when installed",
+    )
+    benchmark_parser.add_argument("--save", default=None, help="write results to this JSON file")
+    benchmark_parser.add_argument("--compare", default=None, help="baseline JSON file to check for regressions")
+    benchmark_parser.add_argument("--threshold", type=float, default=0.2, help="allowed ns/op increase, 0.2 = 20%%")
+    benchmark_parser.set_defaults(func=run_benchmark_command)
+
+    replay_parser = subparsers.add_parser("replay", help="show a recorded game at any move")
+    replay_parser.add_argument("file")
+    replay_parser.add_argument("--game", type=int, default=0, help="index of the game in the file")
+    replay_parser.add_argument("--move", type=int, default=None, help="defaults to the last move")
+    replay_parser.set_defaults(func=run_replay_command)
+
+    args = parser.parse_args()
+    args.func(args)
 
 
 if __name__ == "__main__":
@@ -1,104 +0,0 @@
-# flake8: noqa
-# type: ignore
-
-import sys
-from typing import Dict, List, Tuple
-
-
-class Graph:
-    def __init__(self, nodes: List[Tuple[int, int]], init_graph: Dict[Tuple[int, int], Dict[Tuple[int, int], int]]):
-        self.nodes = nodes
-        self.graph = self.construct_graph(nodes, init_graph)
-
-    def construct_graph(
-        self, nodes: List[Tuple[int, int]], init_graph: Dict[Tuple[int, int], Dict[Tuple[int, int], int]]
-    ):
-        """
-        This method makes sure that the graph is symmetrical. In other words, if there's a path from node A to B with a value V, there needs to be a path from node B to node A with a value V.
-        """
-        graph = {}
-        for node in nodes:
-            graph[node] = {}
-
-        graph.update(init_graph)
-
-        for node, edges in graph.items():
-            for adjacent_node, value in edges.items():
-                if graph[adjacent_node].get(node, False) == False:
-                    graph[adjacent_node][node] = value
-
-        return graph
-
-    def get_nodes(self) -> List[Tuple[int, int]]:
-        "Returns the nodes of the graph."
-        return self.nodes
-
-    def get_outgoing_edges(self, node: Tuple[int, int]):
-        "Returns the neighbors of a node."
-        connections = []
-        for out_node in self.nodes:
-            if self.graph[node].get(out_node, False) != False:
-                connections.append(out_node)
-        return connections
-
-    def value(self, node1: Tuple[int, int], node2: Tuple[int, int]):
-        "Returns the value of an edge between two nodes."
-        return self.graph[node1][node2]
-
-
-def _find_shortest_path(graph: Graph, start_node: Tuple[int, int]):
-    unvisited_nodes = list(graph.get_nodes())
-
-    # We'll use this dict to save the cost of visiting each node and update it as we move along the graph
-    shortest_path = {}
-
-    # We'll use this dict to save the shortest known path to a node found so far
-    previous_nodes = {}
-
-    # We'll use max_value to initialize the "infinity" value of the unvisited nodes
-    max_value = sys.maxsize
-    for node in unvisited_nodes:
-        shortest_path[node] = max_value
-    # However, we initialize the starting node's value with 0
-    shortest_path[start_node] = 0
-
-    # The algorithm executes until we visit all nodes
-    while unvisited_nodes:
-        # The code block below finds the node with the lowest score
-        current_min_node = None
-        for node in unvisited_nodes:  # Iterate over the nodes
-            if current_min_node == None:
-                current_min_node = node
-            elif shortest_path[node] < shortest_path[current_min_node]:
-                current_min_node = node
-
-        # The code block below retrieves the current node's neighbors and updates their distances
-        neighbors = graph.get_outgoing_edges(current_min_node)
-        for neighbor in neighbors:
-            tentative_value = shortest_path[current_min_node] + graph.value(current_min_node, neighbor)
-            if tentative_value < shortest_path[neighbor]:
-                shortest_path[neighbor] = tentative_value
-                # We also update the best path to the current node
-                previous_nodes[neighbor] = current_min_node
-
-        # After visiting its neighbors, we mark the node as "visited"
-        unvisited_nodes.remove(current_min_node)
-
-    return previous_nodes, shortest_path
-
-
-def find_shortest_path(graph: Graph, start_node: Tuple[int, int], end_node: Tuple[int, int]) -> List[Tuple[int, int]]:
-    previous_nodes, _ = _find_shortest_path(graph, start_node)
-
-    path = []
-    node = end_node
-
-    while node != start_node:
-        path.append(node)
-        node = previous_nodes[node]
-
-    # Add the start node manually
-    path.append(start_node)
-
-    result = [p for p in reversed(path)]
-    return result
@@ -0,0 +1,124 @@
+from functools import lru_cache
+from heapq import heappop, heappush
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# CELLS ARE ADDRESSED BY ID (y * width + x), POSITIONS ARE (x, y) LIKE IN SnakeGame
+Position = Tuple[int, int]
+
+
+@lru_cache(maxsize=None)
+def neighbour_array(width: int, height: int) -> np.ndarray:
+    """
+    (width * height, 4) neighbours of every cell in Direction order (UP, RIGHT, DOWN, LEFT), width * height for moves
+    off the board, so a board with one wall cell after its last cell can be indexed with it directly.
+    The one neighbour table: read only because it is cached and shared, neighbour_table is built from it.
+    """
+    y, x = np.divmod(np.arange(width * height), width)
+    new_x = x[:, None] + np.array([0, 1, 0, -1])
+    new_y = y[:, None] + np.array([-1, 0, 1, 0])
+    in_bounds = (new_x >= 0) & (new_x < width) & (new_y >= 0) & (new_y < height)
+    table = np.where(in_bounds, new_y * width + new_x, width * height)
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=None)
+def neighbour_table(width: int, height: int) -> Tuple[Tuple[int, ...], ...]:
+    # neighbour_array AS TUPLES WITH THE WALLS LEFT OUT, FASTER TO LOOP OVER IN PYTHON
+    n_cells = width * height
+    return tuple(tuple(cell for cell in row if cell < n_cells) for row in neighbour_array(width, height).tolist())
+
+
+def _reconstruct(parents: List[int], start_cell: int, end_cell: int, width: int) -> Optional[List[Position]]:
+    if parents[end_cell] == -1:
+        return None
+
+    path = []
+    cell = end_cell
+    while cell != start_cell:
+        path.append(cell)
+        cell = parents[cell]
+    path.append(start_cell)
+
+    return [(cell % width, cell // width) for cell in reversed(path)]
+
+
+def bfs(passable: Sequence[bool], width: int, height: int, start: Position, end: Position) -> Optional[List[Position]]:
+    """
+    Unit weight shortest path over a flat row-major grid, stopping as soon as the end is reached.
+    Returns the path from start to end (both included) or None if the end is unreachable.
+    """
+    table = neighbour_table(width, height)
+    start_cell, end_cell = start[1] * width + start[0], end[1] * width + end[0]
+
+    parents = [-1] * (width * height)
+    parents[start_cell] = start_cell
+    frontier = [start_cell]
+    while frontier and parents[end_cell] == -1:
+        next_frontier = []
+        for cell in frontier:
+            for neighbour in table[cell]:
+                if parents[neighbour] == -1 and passable[neighbour]:
+                    parents[neighbour] = cell
+                    next_frontier.append(neighbour)
+        frontier = next_frontier
+
+    return _reconstruct(parents, start_cell, end_cell, width)
+
+
+def _best_first(
+    weights: Sequence[int], width: int, height: int, start: Position, end: Position, use_heuristic: bool
+) -> Optional[List[Position]]:
+    table = neighbour_table(width, height)
+    start_cell, end_cell = start[1] * width + start[0], end[1] * width + end[0]
+    end_x, end_y = end
+
+    parents = [-1] * (width * height)
+    parents[start_cell] = start_cell
+    costs = [-1] * (width * height)
+    costs[start_cell] = 0
+    closed = [False] * (width * height)
+    heap = [(0, start_cell)]
+    while heap:
+        _, cell = heappop(heap)
+        if cell == end_cell:
+            break
+        if closed[cell]:
+            continue
+        closed[cell] = True
+        cost = costs[cell]
+        for neighbour in table[cell]:
+            weight = weights[neighbour]
+            if not weight:
+                continue
+            new_cost = cost + weight
+            if costs[neighbour] == -1 or new_cost < costs[neighbour]:
+                costs[neighbour] = new_cost
+                parents[neighbour] = cell
+                priority = new_cost
+                if use_heuristic:
+                    y, x = divmod(neighbour, width)
+                    priority += abs(x - end_x) + abs(y - end_y)
+                heappush(heap, (priority, neighbour))
+
+    return _reconstruct(parents, start_cell, end_cell, width)
+
+
+def dijkstra(
+    weights: Sequence[int], width: int, height: int, start: Position, end: Position
+) -> Optional[List[Position]]:
+    """
+    Binary heap Dijkstra where weights[cell] is the cost of entering the cell and a weight of 0 blocks it.
+    Returns the path from start to end (both included) or None if the end is unreachable.
+    """
+    return _best_first(weights, width, height, start, end, use_heuristic=False)
+
+
+def astar(weights: Sequence[int], width: int, height: int, start: Position, end: Position) -> Optional[List[Position]]:
+    """
+    A* with a Manhattan distance heuristic, which is admissible because every weight is at least 1.
+    Same inputs and outputs as dijkstra.
+    """
+    return _best_first(weights, width, height, start, end, use_heuristic=True)
@@ -1,38 +1,269 @@
-from typing import Dict, List, Optional, Tuple
+from __future__ import annotations
+
+import random
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from snake.algorithms.grid_search import neighbour_table
+from snake.game import Direction
+
+CYCLE_CACHE_SIZE = 16
+LAYOUTS = ("zigzag", "transposed", "random", "optimized")
+# RANDOM CANDIDATES TRIED BY THE "optimized" LAYOUT AND (HEAD, FOOD) PAIRS SAMPLED TO SCORE EACH ONE
+OPTIMIZE_CANDIDATES = 8
+OPTIMIZE_SAMPLES = 500
+
+Position = Tuple[int, int]
+
+
+def zigzag_path(width: int, height: int) -> List[Position]:
+    """
+    Down the first column, then back up through the other columns row by row.
+    Closes into a cycle (the last cell is next to the first) when height is even.
+    """
+    path: List[Position] = [(0, i) for i in range(height)]  # STRAIGHT +1 PATH ON AXIS 1
+    if width == 1:
+        return path
+    path.append((1, path[-1][1]))
+
+    cur = path[-1]
+    axis0_move = 1
+    axis1_move = -1
+    while len(path) < width * height:
+        if 1 <= cur[0] + axis0_move < width:
+            new = cur[0] + axis0_move, cur[1]
+        else:
+            new = cur[0], cur[1] + axis1_move
+            axis0_move = -1 if axis0_move == 1 else 1
+        path.append(new)
+        cur = new
+
+    return path
+
+
+def transpose(path: List[Position]) -> List[Position]:
+    return [(y, x) for x, y in path]
+
+
+def random_spanning_tree(width: int, height: int, rng: random.Random) -> Set[Tuple[int, int]]:
+    # RANDOMIZED PRIM OVER A width x height GRID, EDGES ARE (cell, cell + 1) OR (cell, cell + width) PAIRS
+    visited = [False] * (width * height)
+    visited[0] = True
+    frontier = [(0, neighbour) for neighbour in neighbour_table(width, height)[0]]
+    edges = set()
+    while frontier:
+        i = rng.randrange(len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        cell, neighbour = frontier.pop()
+        if visited[neighbour]:
+            continue
+        visited[neighbour] = True
+        edges.add((min(cell, neighbour), max(cell, neighbour)))
+        frontier.extend((neighbour, other) for other in neighbour_table(width, height)[neighbour] if not visited[other])
+    return edges
+
+
+def random_cycle(width: int, height: int, rng: random.Random) -> List[Position]:
+    """
+    Cycle around a random spanning tree of the board's 2x2 blocks, both sides must be even.
+    Every block is a small loop and a tree edge between two blocks opens both loops and joins them.
+    """
+    blocks_w, blocks_h = width // 2, height // 2
+    tree = random_spanning_tree(blocks_w, blocks_h, rng)
+
+    links: List[List[Position]] = [[] for _ in range(width * height)]
+
+    def link(a: Position, b: Position) -> None:
+        links[a[1] * width + a[0]].append(b)
+        links[b[1] * width + b[0]].append(a)
+
+    for block in range(blocks_w * blocks_h):
+        by, bx = divmod(block, blocks_w)
+        x, y = 2 * bx, 2 * by
+        # RIGHT SIDE: BRIDGE TO THE RIGHT BLOCK OR CLOSE THE BLOCK
+        if bx + 1 < blocks_w and (block, block + 1) in tree:
+            link((x + 1, y), (x + 2, y))
+            link((x + 1, y + 1), (x + 2, y + 1))
+        else:
+            link((x + 1, y), (x + 1, y + 1))
+        # BOTTOM SIDE
+        if (block, block + blocks_w) in tree:
+            link((x, y + 1), (x, y + 2))
+            link((x + 1, y + 1), (x + 1, y + 2))
+        else:
+            link((x, y + 1), (x + 1, y + 1))
+        # LEFT AND TOP SIDES ARE BRIDGED BY THE NEIGHBOURING BLOCK'S RIGHT AND BOTTOM SIDES
+        if bx == 0 or (block - 1, block) not in tree:
+            link((x, y), (x, y + 1))
+        if by == 0 or (block - blocks_w, block) not in tree:
+            link((x, y), (x + 1, y))
+
+    # EVERY CELL NOW HAS TWO LINKS, WALK THEM FROM (0, 0)
+    path = [(0, 0)]
+    previous, cur = (0, 0), links[0][0]
+    while cur != (0, 0):
+        path.append(cur)
+        a, b = links[cur[1] * width + cur[0]]
+        previous, cur = cur, (b if a == previous else a)
+    return path
+
+
+def add_column(path: List[Position], width: int) -> List[Position]:
+    """
+    Grows a cycle on a (width - 1) x height board with an even height into one on width x height,
+    by detouring every vertical step between rows 2k and 2k + 1 of the last column through the new one.
+    """
+    last = width - 2
+    grown: List[Position] = []
+    for i, (x, y) in enumerate(path):
+        grown.append((x, y))
+        next_x, next_y = path[(i + 1) % len(path)]
+        if x == last and next_x == last and min(y, next_y) % 2 == 0 and abs(next_y - y) == 1:
+            grown.append((last + 1, y))
+            grown.append((last + 1, next_y))
+    return grown
+
+
+def shortcut_distance(hc: HamiltonianCycle, head: Position, food: Position) -> int:
+    # MOVES FROM head TO food ON AN EMPTY BOARD, ALWAYS STEPPING TO THE NEIGHBOUR CLOSEST TO THE FOOD IN CYCLE ORDER
+    width, n = hc.size[0], len(hc.cycle)
+    table, cell_orders = neighbour_table(hc.size[0], hc.size[1]), hc.cell_orders
+    food_order = cell_orders[food[1] * width + food[0]]
+    cell = head[1] * width + head[0]
+    distance = (food_order - cell_orders[cell]) % n
+    moves = 0
+    while distance:
+        cell = min(table[cell], key=lambda neighbour: (food_order - cell_orders[neighbour]) % n)
+        distance = (food_order - cell_orders[cell]) % n
+        moves += 1
+    return moves
+
+
+def mean_food_distance(hc: HamiltonianCycle, samples: int = OPTIMIZE_SAMPLES, seed: int = 0) -> float:
+    # AVERAGE shortcut_distance OVER RANDOM (HEAD, FOOD) PAIRS, LOWER MEANS FEWER MOVES PER FOOD
+    rng = random.Random(seed)
+    total = 0
+    for _ in range(samples):
+        total += shortcut_distance(hc, rng.choice(hc.cycle), rng.choice(hc.cycle))
+    return total / samples
 
 
 class HamiltonianCycle:
-    def __init__(self, size: Tuple[int, int]):
+    """
+    Cycle through every cell of a size = (width, height) board, in one of these layouts:
+    - "zigzag": the original row by row pattern, or its transpose when only the width is even.
+    - "transposed": the same column by column, or its transpose when only the height is even.
+    - "random": a cycle around a random spanning tree of the 2x2 blocks, seeded by seed.
+    - "optimized": the candidate with the lowest mean_food_distance among the two zigzags and
+      OPTIMIZE_CANDIDATES random cycles.
+    Boards with both sides odd have no Hamiltonian cycle. There "zigzag" and "transposed" fall back to a near-cycle,
+    a path through every cell whose last cell is not next to its first: closed is False and next_direction is -1
+    on the last cell. MCTSSolution plays a random valid move there, the solutions that follow the cycle raise
+    ValueError. The other layouts raise ValueError.
+    """
+
+    def __init__(self, size: Tuple[int, int], layout: str = "zigzag", seed: int = 0):
+        if layout not in LAYOUTS:
+            raise ValueError(f"Unknown cycle layout {layout!r}, expected one of {LAYOUTS}")
         self.size = size
-        self.cycle = self._init_cycle()
-        self.position_map = self._init_position_map()
-
-    def _init_cycle(self) -> List[Tuple[int, int]]:
-        path: List[Tuple[int, int]] = [(0, i) for i in range(self.size[1])]  # STRAIGHT +1 PATH ON AXIS 1
-        path.append((1, path[-1][1]))
-
-        cur = path[-1]
-        axis0_move = 1
-        axis1_move = -1
-        while len(path) < self.size[0] * self.size[1]:
-            if 1 <= cur[0] + axis0_move < self.size[0]:
-                new = cur[0] + axis0_move, cur[1]
-            else:
-                new = cur[0], cur[1] + axis1_move
-                axis0_move = -1 if axis0_move == 1 else 1
-            path.append(new)
-            cur = new
+        self.layout = layout
+        self.seed = seed
+        self.cycle: Tuple[Position, ...] = tuple(self._init_cycle())
+        self.closed = self._validate()
 
-        return path
+        # LOOKUP TABLES, ALL READ ONLY SO A CACHED CYCLE CAN BE SHARED BETWEEN GAMES
+        # cell_orders[y * width + x] IS THE CYCLE ORDER OF THE CELL, cycle_cells IS ITS INVERSE
+        self.cell_orders = self._init_cell_orders()
+        self.cycle_cells = self._freeze(np.array([y * size[0] + x for x, y in self.cycle], dtype=int))
+        self.order = self._freeze(np.array(self.cell_orders, dtype=int).reshape(size[1], size[0]))
+        self.next_direction = self._freeze(self._init_next_direction())
 
-    def _init_position_map(self) -> Dict[Tuple[int, int], int]:
-        mapping = {}
-        for i, pos in enumerate(self.cycle):
-            mapping[pos] = i
-        return mapping
+    def _init_cycle(self) -> List[Position]:
+        width, height = self.size
+        if self.layout == "zigzag":
+            return (
+                zigzag_path(width, height)
+                if height % 2 == 0 or width % 2 == 1
+                else transpose(zigzag_path(height, width))
+            )
+        if self.layout == "transposed":
+            return (
+                transpose(zigzag_path(height, width))
+                if width % 2 == 0 or height % 2 == 1
+                else zigzag_path(width, height)
+            )
+        if width % 2 == 1 and height % 2 == 1:
+            raise ValueError(f"A {width}x{height} board has no Hamiltonian cycle, use the zigzag near-cycle instead")
+        if width < 2 or height < 2:
+            return zigzag_path(width, height)
+        if self.layout == "random":
+            return self._random_cycle(random.Random(self.seed))
+
+        # "optimized", RANDOM CANDIDATES GET DISTINCT SEEDS DERIVED FROM seed
+        candidates = [HamiltonianCycle(self.size, "zigzag"), HamiltonianCycle(self.size, "transposed")]
+        for i in range(OPTIMIZE_CANDIDATES):
+            candidates.append(HamiltonianCycle(self.size, "random", self.seed * OPTIMIZE_CANDIDATES + i))
+        return list(min(candidates, key=mean_food_distance).cycle)
+
+    def _random_cycle(self, rng: random.Random) -> List[Position]:
+        # SPANNING TREE CYCLE ON THE EVEN PART OF THE BOARD, THEN ONE MORE COLUMN (OR ROW) IF A SIDE IS ODD
+        width, height = self.size
+        if width % 2 == 0 and height % 2 == 0:
+            return random_cycle(width, height, rng)
+        if width % 2 == 1:
+            return add_column(random_cycle(width - 1, height, rng), width)
+        return transpose(add_column(random_cycle(height - 1, width, rng), height))
+
+    def _validate(self) -> bool:
+        # EVERY CELL EXACTLY ONCE AND EVERY STEP BETWEEN NEIGHBOURS, RETURNS WHETHER THE LAST STEP CLOSES THE CYCLE
+        width, height = self.size
+        if sorted(self.cycle) != [(x, y) for x in range(width) for y in range(height)]:
+            raise ValueError(f"{self.layout} cycle does not visit every cell of a {width}x{height} board once")
+        for (x, y), (next_x, next_y) in zip(self.cycle, self.cycle[1:]):
+            if abs(next_x - x) + abs(next_y - y) != 1:
+                raise ValueError(
+                    f"{self.layout} cycle steps from {(x, y)} to {(next_x, next_y)}, which are not adjacent"
+                )
+
+        (first_x, first_y), (last_x, last_y) = self.cycle[0], self.cycle[-1]
+        closed = abs(first_x - last_x) + abs(first_y - last_y) == 1
+        if not closed and (width * height) % 2 == 0 and min(width, height) > 1:
+            raise ValueError(f"{self.layout} cycle on a {width}x{height} board does not close")
+        return closed
+
+    def _init_cell_orders(self) -> Tuple[int, ...]:
+        cell_orders = [0] * (self.size[0] * self.size[1])
+        for i, (x, y) in enumerate(self.cycle):
+            cell_orders[y * self.size[0] + x] = i
+        return tuple(cell_orders)
+
+    def _init_next_direction(self) -> np.ndarray:
+        # Direction VALUE LEADING TO THE NEXT CELL IN THE CYCLE, INDEXED LIKE THE BOARD AS [y, x]
+        # -1 WHERE THE NEXT CELL IS NOT ADJACENT
+        deltas = {(0, -1): Direction.UP, (1, 0): Direction.RIGHT, (0, 1): Direction.DOWN, (-1, 0): Direction.LEFT}
+        next_direction = np.full((self.size[1], self.size[0]), -1, dtype=int)
+        for i, (x, y) in enumerate(self.cycle):
+            next_x, next_y = self.cycle[(i + 1) % len(self.cycle)]
+            direction = deltas.get((next_x - x, next_y - y))
+            if direction is not None:
+                next_direction[y, x] = direction.value
+        return next_direction
+
+    @staticmethod
+    def _freeze(array: np.ndarray) -> np.ndarray:
+        array.setflags(write=False)
+        return array
 
     def get_position_order(self, pos: Tuple[int, int]) -> int:
-        return self.position_map[pos]
+        return self.cell_orders[pos[1] * self.size[0] + pos[0]]
+
+    def get_next_position(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        return self.cycle[(self.get_position_order(pos) + 1) % len(self.cycle)]
+
+    def get_next_direction(self, pos: Tuple[int, int]) -> Direction:
+        return Direction(int(self.next_direction[pos[1], pos[0]]))
 
     def visualize_cycle(self) -> None:
         mat: List[List[Optional[int]]] = [[None for _ in range(self.size[0])] for _ in range(self.size[1])]
@@ -43,3 +274,12 @@ class HamiltonianCycle:
         for row in mat:
             print([str(num).zfill(2) for num in row])
         print("\n\n\n")
+
+
+@lru_cache(maxsize=CYCLE_CACHE_SIZE)
+def get_hamiltonian_cycle(size: Tuple[int, int], layout: str = "zigzag", seed: int = 0) -> HamiltonianCycle:
+    """
+    Process wide cache of cycles keyed by board size, layout and seed, least recently used ones are evicted first.
+    The returned cycle is shared and must not be modified.
+    """
+    return HamiltonianCycle(size, layout, seed)
@@ -0,0 +1,100 @@
+from typing import Callable, List, Tuple
+
+from snake.algorithms.grid_search import neighbour_table
+from snake.game import Direction, SnakeGame
+
+# "tail": THE HEAD CAN STILL REACH THE TAIL, "free_space": AND NO FREE CELL IS CUT OFF
+# BOTH COST MOVES ON 10x10 (GREEDY 1464 -> 2280 AND 2151 PER GAME), SO THE SOLVERS LEAVE THEM OFF BY DEFAULT
+REACHABILITY_CHECKS = ("tail", "free_space")
+
+
+class ReachabilityChecker:
+    """
+    Flood fill safety checks for one board size. The visited marks and the queue are allocated once and reused:
+    a check bumps the generation instead of clearing the marks, so a check allocates nothing.
+    Occupancy is read from game.free_slots, which holds -1 for snake cells.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.table = neighbour_table(width, height)
+        # visited[cell] == generation MEANS cell WAS REACHED BY THE CURRENT CHECK
+        self.visited: List[int] = [0] * (width * height)
+        self.queue: List[int] = [0] * (width * height)
+        self.generation = 0
+
+    def flood_fill(self, game: SnakeGame, start: int, target: int, vacated: int, limit: int) -> Tuple[int, bool]:
+        """
+        Counts the free cells reachable from start, start included. vacated is a snake cell that counts as free
+        (-1 for none) and target is a snake cell that can be reached but not crossed.
+        Stops early once target is found and at least limit cells are counted.
+        Returns the count and whether target was found.
+        """
+        self.generation += 1
+        generation = self.generation
+        visited, queue, table, free_slots = self.visited, self.queue, self.table, game.free_slots
+
+        visited[start] = generation
+        queue[0] = start
+        read, write = 0, 1
+        found = False
+        while read < write:
+            cell = queue[read]
+            read += 1
+            for neighbour in table[cell]:
+                if visited[neighbour] == generation:
+                    continue
+                if neighbour == target:
+                    found = True
+                elif free_slots[neighbour] != -1 or neighbour == vacated:
+                    visited[neighbour] = generation
+                    queue[write] = neighbour
+                    write += 1
+            if found and write >= limit:
+                break
+
+        return write, found
+
+    def _after_move(self, game: SnakeGame, direction: Direction) -> Tuple[int, int, int]:
+        # start (THE NEW HEAD), target (THE NEW TAIL) AND vacated (THE CELL THE TAIL LEAVES, -1 WHEN EATING)
+        new_x, new_y = game.potential_position(direction)
+        width = self.width
+        body = game.snake.body
+        if game.food_pos == (new_x, new_y):
+            # THE TAIL STAYS WHERE IT IS
+            return new_y * width + new_x, body[0].y * width + body[0].x, -1
+        # THE TAIL MOVES UP ONE NODE AND FREES ITS CELL
+        return new_y * width + new_x, body[1].y * width + body[1].x, body[0].y * width + body[0].x
+
+    def can_reach_tail(self, game: SnakeGame, direction: Direction) -> bool:
+        """
+        True if after moving in direction the head can still reach where the tail will be,
+        so the snake can at least keep chasing its tail. The move itself must be valid.
+        """
+        if game.length <= 2:
+            return True
+        start, target, vacated = self._after_move(game, direction)
+        return self.flood_fill(game, start, target, vacated, 0)[1]
+
+    def keeps_free_space_connected(self, game: SnakeGame, direction: Direction) -> bool:
+        """
+        True if after moving in direction the head can still reach the tail and every free cell.
+        A move that fails cuts a pocket off the board that the snake can only get back to once its body moves away,
+        and food spawning in it is expensive to reach. The move itself must be valid.
+        """
+        if game.length <= 2:
+            return True
+        start, target, vacated = self._after_move(game, direction)
+        # THE NEW HEAD TAKES ITS CELL AND THE TAIL GIVES ONE BACK
+        n_free = len(game.free_cells) - (game.free_slots[start] != -1) + (vacated not in (-1, start))
+        count, found = self.flood_fill(game, start, target, vacated, n_free + 1)
+        return found and count - 1 >= n_free
+
+
+def get_reachability_check(name: str, width: int, height: int) -> Callable[[SnakeGame, Direction], bool]:
+    # THE CHECK A SOLVER'S reachability_check OPTION NAMES, ON ITS OWN SCRATCH BUFFERS
+    if name not in REACHABILITY_CHECKS:
+        raise ValueError(f"Unknown reachability check {name!r}, expected one of {REACHABILITY_CHECKS}")
+    checker = ReachabilityChecker(width, height)
+    return checker.can_reach_tail if name == "tail" else checker.keeps_free_space_connected
@@ -0,0 +1,151 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from snake.algorithms.grid_search import neighbour_array
+from snake.kernels import compiled_kernels, get_backend
+
+
+class BatchSnakeGame:
+    """
+    K snake games advanced in lockstep with the same rules as SnakeGame.
+    Boards are a (K, H, W) int8 array and every per game quantity is an array of length K.
+    Cells are addressed by id (y * width + x) and each body is a ring buffer of cell ids from tail to head.
+    """
+
+    def __init__(self, n_games: int, width: int, height: int, seed: Optional[int] = None):
+        self.head_val = 5
+        self.body_val = 1
+        self.food_val = 9
+        self.n_games = n_games
+        self.width = width
+        self.height = height
+        self.random = np.random.default_rng(seed)
+
+        n_cells = width * height
+        # EVERY BOARD HAS ONE EXTRA WALL CELL AFTER ITS LAST CELL, neighbours POINTS MOVES OFF THE BOARD AT IT
+        # SO A WALL CHECK IS THE SAME LOOKUP AS A BODY CHECK
+        self.padded = np.zeros((n_games, n_cells + 1), dtype=np.int8)
+        self.padded[:, n_cells] = self.body_val
+        self.neighbours = neighbour_array(width, height)
+        # FLAT VIEW OF THE BOARDS INDEXED BY CELL ID, AND THE (K, H, W) VIEW OF IT
+        self.cells = self.padded[:, :n_cells]
+        self.boards = self.cells.reshape(n_games, height, width)
+
+        start = (height // 2) * width + width // 2
+        self.bodies = np.zeros((n_games, n_cells), dtype=np.int64)
+        self.bodies[:, 0] = start
+        self.head_ptrs = np.zeros(n_games, dtype=np.int64)
+        self.tail_ptrs = np.zeros(n_games, dtype=np.int64)
+        self.heads = np.full(n_games, start, dtype=np.int64)
+        self.tails = np.full(n_games, start, dtype=np.int64)
+        self.food = np.full(n_games, -1, dtype=np.int64)
+        self.cells[:, start] = self.head_val
+
+        self.lengths = np.ones(n_games, dtype=np.int64)
+        self.move_counts = np.zeros(n_games, dtype=np.int64)
+        self.done = np.zeros(n_games, dtype=bool)
+        self.max_length = n_cells - 1
+        # GAMES THAT ATE ON THE LAST STEP OF THE numba BACKEND
+        self.ate = np.zeros(n_games, dtype=bool)
+
+        self.spawn_food(np.arange(n_games))
+
+    def spawn_food(self, games: np.ndarray) -> None:
+        # PICK THE r-TH EMPTY CELL OF EVERY GAME, WITH r UNIFORM OVER ITS EMPTY CELL COUNT
+        if games.size == 0:
+            return
+        empty = self.cells[games] == 0
+        ranks = self.random.integers(0, empty.sum(axis=1))
+        food = (np.cumsum(empty, axis=1) > ranks[:, None]).argmax(axis=1)
+        self.food[games] = food
+        self.cells[games, food] = self.food_val
+
+    def head_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        y, x = np.divmod(self.heads, self.width)
+        return x, y
+
+    def food_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        y, x = np.divmod(self.food, self.width)
+        return x, y
+
+    def valid_actions(self) -> np.ndarray:
+        """
+        (K, 4) bool array of the valid moves of every game, indexed by Direction value, from one lookup of the
+        four neighbours of every head. Moving onto the tail is valid when length > 2, it moves out of the way.
+        Rows of finished games are computed the same way and mean nothing.
+        """
+        targets = self.neighbours[self.heads]
+        values = np.take_along_axis(self.padded, targets, axis=1)
+        vacating_tail = (targets == self.tails[:, None]) & (self.lengths[:, None] > 2)
+        return (values != self.body_val) | vacating_tail
+
+    def step(self, directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Applies directions[k] (a Direction value) to every game that is not done yet and returns copies of the
+        done and score (length) arrays. Directions of finished games are ignored.
+        """
+        if get_backend() == "numba":
+            return self._step_compiled(directions)
+
+        directions = np.asarray(directions)
+        active = np.flatnonzero(~self.done)
+        if active.size == 0:
+            return self.done.copy(), self.lengths.copy()
+
+        # CHECK IF MOVE IS BLOCKED BY WALL OR SNAKE BODY, UNLESS IT IS THE TAIL AND IT WILL MOVE OUT OF THE WAY
+        new_cells = self.neighbours[self.heads[active], directions[active]]
+        targets = self.padded[active, new_cells]
+        vacating_tail = (new_cells == self.tails[active]) & (self.lengths[active] > 2)
+        valid = (targets != self.body_val) | vacating_tail
+
+        self.move_counts[active] += 1
+        self.done[active[~valid]] = True
+
+        movers = active[valid]
+        new_cells = new_cells[valid]
+        ate = targets[valid] == self.food_val
+        walkers = movers[~ate]
+
+        # OLD HEAD BECOMES BODY AND TAILS OF SNAKES THAT DID NOT EAT ARE CLEARED BEFORE THE NEW HEADS ARE WRITTEN
+        self.cells[movers, self.heads[movers]] = self.body_val
+        self.cells[walkers, self.tails[walkers]] = 0
+
+        self.head_ptrs[movers] = (self.head_ptrs[movers] + 1) % self.bodies.shape[1]
+        self.bodies[movers, self.head_ptrs[movers]] = new_cells
+        self.heads[movers] = new_cells
+        self.cells[movers, new_cells] = self.head_val
+
+        self.tail_ptrs[walkers] = (self.tail_ptrs[walkers] + 1) % self.bodies.shape[1]
+        self.tails[walkers] = self.bodies[walkers, self.tail_ptrs[walkers]]
+
+        eaters = movers[ate]
+        self.lengths[eaters] += 1
+        self.spawn_food(eaters)
+
+        self.done[movers[self.lengths[movers] == self.max_length]] = True
+
+        return self.done.copy(), self.lengths.copy()
+
+    def _step_compiled(self, directions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # SAME STEP AS ABOVE, ONE GAME AT A TIME IN A COMPILED LOOP, THEN FOOD FOR THE GAMES THAT ATE
+        compiled_kernels().step_games(
+            self.padded,
+            self.neighbours,
+            self.bodies,
+            self.head_ptrs,
+            self.tail_ptrs,
+            self.heads,
+            self.tails,
+            self.lengths,
+            self.move_counts,
+            self.done,
+            np.asarray(directions, dtype=np.int64),
+            self.ate,
+            self.head_val,
+            self.body_val,
+            self.food_val,
+            self.max_length,
+        )
+        self.spawn_food(np.flatnonzero(self.ate))
+        return self.done.copy(), self.lengths.copy()
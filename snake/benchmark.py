@@ -0,0 +1,216 @@
+import contextlib
+import io
+import json
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Sequence, Tuple, Type
+
+import numpy as np
+
+from snake.algorithms.grid_search import bfs
+from snake.algorithms.hamiltonian import HamiltonianCycle, get_hamiltonian_cycle
+from snake.batch_game import BatchSnakeGame
+from snake.game import Direction, SnakeGame
+from snake.kernels import get_backend, set_backend, warm_up
+from snake.solutions.base import BaseSolution
+from snake.solutions.shortest_path import PathPlanner
+
+BENCHMARK_SIZES = [(6, 6), (8, 8), (16, 16), (32, 32), (64, 64)]
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    width: int
+    height: int
+    ops: int
+    ns_per_op: float
+    # NOT PART OF THE KEY, SO RUNS ON DIFFERENT BACKENDS COMPARE AGAINST EACH OTHER
+    backend: str = "python"
+
+    @property
+    def key(self) -> str:
+        return "{}[{}x{}]".format(self.name, self.width, self.height)
+
+    @property
+    def ops_per_sec(self) -> float:
+        return 1e9 / self.ns_per_op if self.ns_per_op else float("inf")
+
+
+def best_of(run: Callable[[], int], repeat: int) -> Tuple[int, float]:
+    # run() RETURNS HOW MANY OPERATIONS IT DID, THE FASTEST REPEAT IS KEPT TO FILTER OUT NOISE
+    best = float("inf")
+    ops = 0
+    for _ in range(repeat):
+        start = perf_counter_ns()
+        ops = run()
+        best = min(best, (perf_counter_ns() - start) / max(ops, 1))
+    return ops, best
+
+
+def cap_moves(game: SnakeGame, max_moves: int) -> None:
+    # END THE GAME AFTER max_moves SO FULL SOLUTIONS CAN BE TIMED ON LARGE BOARDS
+    make_move = game.make_move
+
+    def capped_make_move(direction):
+        return make_move(direction) or game.move_count >= max_moves
+
+    game.make_move = capped_make_move  # type: ignore
+
+
+def bench_make_move(size: Tuple[int, int], n_moves: int, repeat: int) -> BenchmarkResult:
+    hc = get_hamiltonian_cycle(size)
+
+    def run() -> int:
+        game = SnakeGame(size[0], size[1], seed=0)
+        for _ in range(n_moves):
+            head_x, head_y = game.snake.head.get_position()
+            if game.make_move(Direction(int(hc.next_direction[head_y, head_x]))):
+                game = SnakeGame(size[0], size[1], seed=0)
+        return n_moves
+
+    return BenchmarkResult("make_move", size[0], size[1], *best_of(run, repeat))
+
+
+def bench_spawn_food(size: Tuple[int, int], n_spawns: int, repeat: int) -> BenchmarkResult:
+    game = SnakeGame(size[0], size[1], seed=0)
+
+    def run() -> int:
+        for _ in range(n_spawns):
+            game.spawn_food()
+        return n_spawns
+
+    return BenchmarkResult("spawn_food", size[0], size[1], *best_of(run, repeat))
+
+
+def bench_cycle_construction(size: Tuple[int, int], repeat: int) -> BenchmarkResult:
+    def run() -> int:
+        HamiltonianCycle(size)
+        return 1
+
+    return BenchmarkResult("hamiltonian_cycle", size[0], size[1], *best_of(run, repeat))
+
+
+def bench_shortest_path(size: Tuple[int, int], repeat: int) -> BenchmarkResult:
+    # CORNER TO CORNER ON AN EMPTY BOARD, THE WORST CASE FOR AN EARLY EXIT SEARCH
+    passable = [True] * (size[0] * size[1])
+
+    def run() -> int:
+        bfs(passable, size[0], size[1], (0, 0), (size[0] - 1, size[1] - 1))
+        return 1
+
+    return BenchmarkResult("grid_bfs", size[0], size[1], *best_of(run, repeat))
+
+
+def bench_batch_step(size: Tuple[int, int], n_games: int, n_steps: int, repeat: int) -> BenchmarkResult:
+    # n_games GAMES FOLLOWING THE CYCLE IN LOCKSTEP, AN OPERATION IS ONE GAME MOVING ONCE
+    hc = get_hamiltonian_cycle(size)
+    next_direction = hc.next_direction.ravel()
+
+    def run() -> int:
+        games = BatchSnakeGame(n_games, size[0], size[1], seed=0)
+        for _ in range(n_steps):
+            done, _ = games.step(next_direction[games.heads])
+            if done.all():
+                games = BatchSnakeGame(n_games, size[0], size[1], seed=0)
+        return n_games * n_steps
+
+    return BenchmarkResult("batch_step", size[0], size[1], *best_of(run, repeat), backend=get_backend())
+
+
+def bench_path_plan(size: Tuple[int, int], repeat: int) -> BenchmarkResult:
+    # PathPlanner ON AN EMPTY BOARD FROM THE START OF THE CYCLE TO THE CELL FARTHEST FROM IT, A FRESH PLANNER EVERY TIME
+    hc = get_hamiltonian_cycle(size)
+    board = np.zeros((size[1], size[0]), dtype=int)
+    head = hc.cycle[0]
+    food = max(hc.cycle, key=lambda pos: abs(pos[0] - head[0]) + abs(pos[1] - head[1]))
+
+    def run() -> int:
+        PathPlanner(hc).plan(board, head, head, food)
+        return 1
+
+    return BenchmarkResult("path_plan", size[0], size[1], *best_of(run, repeat), backend=get_backend())
+
+
+def bench_solution(
+    name: str, solution_class: Type[BaseSolution], params: Dict[str, Any], size: Tuple[int, int], max_moves: int
+) -> BenchmarkResult:
+    def run() -> int:
+        game = SnakeGame(size[0], size[1], seed=0)
+        cap_moves(game, max_moves)
+        solution = solution_class(game=game, to_print=False, frame_period=0, **params)
+        with contextlib.redirect_stdout(io.StringIO()):
+            game = solution.run()
+        return game.move_count
+
+    return BenchmarkResult(name, size[0], size[1], *best_of(run, 1), backend=get_backend())
+
+
+def run_benchmarks(
+    solutions: Mapping[str, Tuple[Type[BaseSolution], Dict[str, Any]]],
+    sizes: Sequence[Tuple[int, int]] = BENCHMARK_SIZES,
+    max_moves: int = 20000,
+    repeat: int = 5,
+    backend: str = "python",
+) -> List[BenchmarkResult]:
+    """
+    Micro benchmarks and full solutions on every size. backend selects the kernels (see snake.kernels) for the
+    benchmarks that have them: batch_step, path_plan and solutions that plan paths. The others always run
+    the Python code and are only there to compare with a python run.
+    """
+    previous = get_backend()
+    if set_backend(backend) == "numba":
+        warm_up()
+    try:
+        results = []
+        for size in sizes:
+            results.append(bench_make_move(size, 5000, repeat))
+            results.append(bench_spawn_food(size, 5000, repeat))
+            results.append(bench_cycle_construction(size, repeat))
+            results.append(bench_shortest_path(size, repeat))
+            results.append(bench_batch_step(size, 64, 200, repeat))
+            results.append(bench_path_plan(size, repeat))
+            for name, (solution_class, params) in solutions.items():
+                results.append(bench_solution(name, solution_class, params, size, max_moves))
+        return results
+    finally:
+        set_backend(previous)
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    lines = ["{:<36} {:>8} {:>10} {:>14} {:>14}".format("benchmark", "backend", "ops", "ns/op", "ops/sec")]
+    for result in results:
+        lines.append(
+            "{:<36} {:>8} {:>10} {:>14.0f} {:>14.0f}".format(
+                result.key, result.backend, result.ops, result.ns_per_op, result.ops_per_sec
+            )
+        )
+    return "\n".join(lines)
+
+
+def save_results(results: Sequence[BenchmarkResult], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump([result._asdict() for result in results], f, indent=2)
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    with open(path) as f:
+        return [BenchmarkResult(**result) for result in json.load(f)]
+
+
+def compare_results(
+    results: Sequence[BenchmarkResult], baseline: Sequence[BenchmarkResult], threshold: float
+) -> List[str]:
+    # BENCHMARKS WHOSE ns/op GREW BY MORE THAN threshold (0.2 = 20%) COMPARED TO THE BASELINE
+    baseline_by_key = {result.key: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = baseline_by_key.get(result.key)
+        if base is None or base.ns_per_op == 0:
+            continue
+        change = result.ns_per_op / base.ns_per_op - 1
+        if change > threshold:
+            regressions.append(
+                "{}: {:.0f} ns/op -> {:.0f} ns/op (+{:.0%})".format(
+                    result.key, base.ns_per_op, result.ns_per_op, change
+                )
+            )
+    return regressions
@@ -0,0 +1,371 @@
+import sys
+from array import array
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from snake.game import BaseSnakeGame, BodyNode, Direction, GameSnapshot, UndoEntry, padded_walls
+
+WORD_MASK = (1 << 64) - 1
+
+
+def popcount(bits: int) -> int:
+    # int.bit_count IS ONLY AVAILABLE FROM PYTHON 3.10
+    return bin(bits).count("1")
+
+
+class BitBoard:
+    """
+    Occupancy of a width x height board, bit (y * width + x) is set for occupied cells. The bits are kept in 64-bit
+    words, so set, clear and test cost the same on any board size. bits joins the words into one Python int for the
+    whole-board operations, which are O(cells) anyway: counting is a popcount and flood fill is repeated dilation.
+    """
+
+    def __init__(self, width: int, height: int, bits: int = 0):
+        self.width = width
+        self.height = height
+        self.n_words = (width * height + 63) // 64
+        self.bits = bits
+        self.full = (1 << (width * height)) - 1
+
+        # COLUMN MASKS THAT STOP HORIZONTAL SHIFTS FROM WRAPPING INTO THE NEXT OR PREVIOUS ROW
+        first_column = 0
+        for y in range(height):
+            first_column |= 1 << (y * width)
+        self.not_first_column = self.full ^ first_column
+        self.not_last_column = self.full ^ (first_column << (width - 1))
+
+    @property
+    def bits(self) -> int:
+        return int.from_bytes(self.words.tobytes(), sys.byteorder)
+
+    @bits.setter
+    def bits(self, bits: int) -> None:
+        self.words = array("Q", bits.to_bytes(8 * self.n_words, sys.byteorder))
+
+    def set(self, cell: int) -> None:
+        self.words[cell >> 6] |= 1 << (cell & 63)
+
+    def clear(self, cell: int) -> None:
+        self.words[cell >> 6] &= WORD_MASK ^ (1 << (cell & 63))
+
+    def test(self, cell: int) -> bool:
+        return (self.words[cell >> 6] >> (cell & 63)) & 1 == 1
+
+    def count(self) -> int:
+        return popcount(self.bits)
+
+    def free_count(self) -> int:
+        return self.width * self.height - self.count()
+
+    def free_cells(self) -> np.ndarray:
+        # CELL IDS OF ALL FREE CELLS IN INCREASING ORDER
+        n_cells = self.width * self.height
+        words = np.frombuffer(self.words, dtype=np.uint64).astype("<u8")
+        free = np.unpackbits(~words.view(np.uint8), bitorder="little")[:n_cells]
+        return np.flatnonzero(free)
+
+    def dilate(self, bits: int) -> int:
+        # bits PLUS ITS 4-NEIGHBOURS, CLIPPED TO THE BOARD
+        width = self.width
+        return (
+            bits
+            | (bits << width)
+            | (bits >> width)
+            | ((bits << 1) & self.not_first_column)
+            | ((bits >> 1) & self.not_last_column)
+        ) & self.full
+
+    def flood_fill(self, cell: int, blocked: Optional[int] = None) -> int:
+        # BITS OF EVERY CELL REACHABLE FROM cell THROUGH CELLS NOT IN blocked (DEFAULTS TO THE OCCUPANCY)
+        passable = ~(self.bits if blocked is None else blocked) & self.full
+        region = 1 << cell
+        while True:
+            grown = self.dilate(region) & (passable | region)
+            if grown == region:
+                return region
+            region = grown
+
+    def reachable_count(self, cell: int) -> int:
+        return popcount(self.flood_fill(cell))
+
+
+class RingSnake:
+    """
+    Snake body as a growable ring buffer of 32-bit cell ids, ordered from tail to head.
+    head, tail and body are built on access and have the same interface as Snake's.
+    """
+
+    def __init__(self, width: int, x: int, y: int):
+        self.width = width
+        self.cells = array("I", [y * width + x])
+        self.tail_ptr = 0
+        self.length = 1
+
+    @property
+    def head_cell(self) -> int:
+        return self.cells[(self.tail_ptr + self.length - 1) % len(self.cells)]
+
+    @property
+    def tail_cell(self) -> int:
+        return self.cells[self.tail_ptr]
+
+    @property
+    def head(self) -> BodyNode:
+        y, x = divmod(self.head_cell, self.width)
+        return BodyNode(x, y)
+
+    @property
+    def tail(self) -> BodyNode:
+        y, x = divmod(self.tail_cell, self.width)
+        return BodyNode(x, y)
+
+    @property
+    def body(self) -> List[BodyNode]:
+        # FROM TAIL TO HEAD, O(LENGTH)
+        capacity = len(self.cells)
+        cells = [self.cells[(self.tail_ptr + i) % capacity] for i in range(self.length)]
+        return [BodyNode(cell % self.width, cell // self.width) for cell in cells]
+
+    def get_head(self) -> BodyNode:
+        return self.head
+
+    def get_tail(self) -> BodyNode:
+        return self.tail
+
+    def push_head(self, cell: int) -> None:
+        if self.length == len(self.cells):
+            # FULL, LINEARIZE FROM THE TAIL AND DOUBLE THE CAPACITY
+            self.cells = self.cells[self.tail_ptr :] + self.cells[: self.tail_ptr]
+            self.cells.extend(self.cells)
+            self.tail_ptr = 0
+        self.cells[(self.tail_ptr + self.length) % len(self.cells)] = cell
+        self.length += 1
+
+    def pop_tail(self) -> int:
+        cell = self.cells[self.tail_ptr]
+        self.tail_ptr = (self.tail_ptr + 1) % len(self.cells)
+        self.length -= 1
+        return cell
+
+    def pop_head(self) -> int:
+        cell = self.head_cell
+        self.length -= 1
+        return cell
+
+    def push_tail(self, cell: int) -> None:
+        # ONLY USED TO UNDO pop_tail, SO THE BUFFER HAS ROOM
+        self.tail_ptr = (self.tail_ptr - 1) % len(self.cells)
+        self.cells[self.tail_ptr] = cell
+        self.length += 1
+
+    def __len__(self) -> int:
+        return self.length
+
+
+class BitboardSnakeGame(BaseSnakeGame):
+    """
+    Game with SnakeGame's rules and interface, but the occupancy is a BitBoard of the snake cells and the body a
+    RingSnake, so large boards take about a bit per cell. A move is O(1) like in SnakeGame and about 15% slower
+    (4.5 against 4 microseconds from 64x64 up to 512x512). board is built on access, which costs O(cells) and is
+    meant for display and for code that reads the whole board. Food is drawn by rejection sampling, so seeded games
+    differ from SnakeGame's.
+    """
+
+    snake: RingSnake
+
+    def __init__(self, width: int, height: int, seed: Optional[int] = None):
+        super().__init__(width, height, seed)
+        start_x = width // 2
+        start_y = height // 2
+        self.snake = RingSnake(width, start_x, start_y)
+        self.occupied = BitBoard(width, height)
+        self.occupied.set(start_y * width + start_x)
+
+        self.spawn_food()
+
+    @property
+    def board(self) -> np.ndarray:
+        board = np.zeros(self.width * self.height, dtype=int)
+        board[np.flatnonzero(~self.free_mask())] = self.body_val
+        board[self.snake.head_cell] = self.head_val
+        board[self.food_cell] = self.food_val
+        return board.reshape(self.height, self.width)
+
+    def snapshot(self) -> GameSnapshot:
+        # THE SAME SNAPSHOT A SnakeGame IN THIS STATE WOULD TAKE, FREE CELLS IN INCREASING ORDER
+        width = self.width
+        body = self.snake.body
+        free_cells = self.occupied.free_cells().tolist()
+        free_slots = [-1] * (width * self.height)
+        for slot, cell in enumerate(free_cells):
+            free_slots[cell] = slot
+        blocked = padded_walls(width, self.height)
+        for node in body:
+            blocked[(node.y + 1) * (width + 2) + node.x + 1] = 1
+        return GameSnapshot(
+            self.board,
+            free_cells,
+            free_slots,
+            bytes(blocked),
+            tuple(node.get_position() for node in body),
+            self.food_index,
+            self.length,
+            self.move_count,
+            self.random.getstate(),
+        )
+
+    def restore(self, snapshot: GameSnapshot, restore_random: bool = True) -> None:
+        width = self.width
+        self.snake = RingSnake(width, *snapshot.body[0])
+        for x, y in snapshot.body[1:]:
+            self.snake.push_head(y * width + x)
+        self.occupied.bits = 0
+        for x, y in snapshot.body:
+            self.occupied.set(y * width + x)
+        food_y, food_x = snapshot.food_index
+        self.food_cell = food_y * width + food_x
+        self.food_index = snapshot.food_index
+        self.food_pos = food_x, food_y
+        self.length = snapshot.length
+        self.move_count = snapshot.move_count
+        if restore_random:
+            self.random.setstate(snapshot.random_state)
+
+    def free_mask(self) -> np.ndarray:
+        mask = np.zeros(self.width * self.height, dtype=bool)
+        mask[self.occupied.free_cells()] = True
+        return mask
+
+    def spawn_food(self) -> None:
+        # WHILE AT LEAST HALF THE BOARD IS FREE, DRAW CELLS UNTIL A FREE ONE IS HIT (UNDER 2 DRAWS ON AVERAGE),
+        # OTHERWISE PICK AMONG THE FREE CELLS DIRECTLY. THE SNAKE IS length CELLS, SO NOTHING IS COUNTED
+        n_cells = self.width * self.height
+        if (n_cells - self.length) * 2 >= n_cells:
+            cell = self.random.randrange(n_cells)
+            while self.occupied.test(cell):
+                cell = self.random.randrange(n_cells)
+        else:
+            free_cells = self.occupied.free_cells()
+            cell = int(free_cells[self.random.randrange(len(free_cells))])
+
+        self.food_cell = cell
+        food_y, food_x = divmod(cell, self.width)
+        self.food_index = food_y, food_x
+        self.food_pos = food_x, food_y
+
+    def check_valid(self, direction: Direction) -> bool:
+        # check if move is blocked by wall
+        new_x, new_y = self.potential_position(direction)
+        if new_x == -1 or new_x == self.width:
+            return False
+        if new_y == -1 or new_y == self.height:
+            return False
+
+        # check if move is blocked by snake body
+        cell = new_y * self.width + new_x
+        if self.occupied.test(cell):
+            # IF BLOCKED BY TAIL AND LENGTH > 2, THEN TAIL WILL MOVE OUT OF THE WAY AND IT IS FINE
+            return cell == self.snake.tail_cell and self.length > 2
+        return True
+
+    def valid_actions(self) -> int:
+        # SAME MASK AS SnakeGame.valid_actions, WALLS ARE CHECKED FROM THE HEAD'S ROW AND COLUMN
+        snake = self.snake
+        width = self.width
+        head = snake.head_cell
+        head_y, head_x = divmod(head, width)
+        tail = snake.tail_cell if self.length > 2 else -1
+        occupied = self.occupied
+        mask = 0
+        for bit, cell, inside in (
+            (0, head - width, head_y > 0),
+            (1, head + 1, head_x < width - 1),
+            (2, head + width, head_y < self.height - 1),
+            (3, head - 1, head_x > 0),
+        ):
+            if inside and (cell == tail or not occupied.test(cell)):
+                mask |= 1 << bit
+        return mask
+
+    def make_move(self, direction: Direction) -> bool:
+        game_over = False
+        if self.check_valid(direction):
+            new_x, new_y = self.potential_position(direction)
+            cell = new_y * self.width + new_x
+            snake = self.snake
+            if cell == self.food_cell:
+                # extend the snake
+                snake.push_head(cell)
+                self.occupied.set(cell)
+                self.length += 1
+                self.spawn_food()
+            else:
+                # move the snake
+                self.occupied.clear(snake.pop_tail())
+                snake.push_head(cell)
+                self.occupied.set(cell)
+        else:
+            game_over = True
+
+        if self.length == self.max_length:
+            game_over = True
+
+        self.move_count += 1
+
+        return game_over
+
+    def reachable_from_head(self, direction: Direction) -> Tuple[int, bool]:
+        """
+        Free cells reachable after moving in direction, and whether the tail cell is reachable.
+        Without food the tail moves out of the way and its cell counts as free. A move that eats leaves the tail
+        where it is, so it stays blocked and is reachable when a reachable cell is next to it.
+        """
+        new_x, new_y = self.potential_position(direction)
+        cell = new_y * self.width + new_x
+        occupied = self.occupied.bits
+        tail_bit = 1 << self.snake.tail_cell
+        if cell == self.food_cell:
+            region = self.occupied.flood_fill(cell, occupied | (1 << cell))
+            return popcount(region) - 1, self.occupied.dilate(region) & tail_bit != 0
+        region = self.occupied.flood_fill(cell, (occupied | (1 << cell)) & ~tail_bit)
+        return popcount(region) - 1, region & tail_bit != 0
+
+    def push_move(self, direction: Direction) -> bool:
+        # SAME UNDO LOG AS SnakeGame, head_slot IS UNUSED WITHOUT FREE CELL ARRAYS
+        ate = False
+        valid = self.check_valid(direction)
+        if valid:
+            new_x, new_y = self.potential_position(direction)
+            ate = new_y * self.width + new_x == self.food_cell
+        self.undo_log.append(
+            UndoEntry(
+                valid,
+                ate,
+                self.snake.tail.get_position(),
+                self.food_index,
+                -1,
+                self.random.getstate() if ate else None,
+            )
+        )
+        return self.make_move(direction)
+
+    def pop_move(self) -> None:
+        entry = self.undo_log.pop()
+        self.move_count -= 1
+        if not entry.valid:
+            return
+
+        snake = self.snake
+        self.occupied.clear(snake.pop_head())
+        if entry.ate:
+            food_y, food_x = entry.old_food_index
+            self.food_cell = food_y * self.width + food_x
+            self.food_index = entry.old_food_index
+            self.food_pos = food_x, food_y
+            self.random.setstate(entry.random_state)
+            self.length -= 1
+        else:
+            tail_x, tail_y = entry.old_tail
+            snake.push_tail(tail_y * self.width + tail_x)
+            self.occupied.set(tail_y * self.width + tail_x)
@@ -0,0 +1,124 @@
+import random
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from snake.game import Direction, SnakeGame
+
+# CHANNELS OF THE BOARD OBSERVATION
+HEAD, BODY, FOOD = 0, 1, 2
+# ENTRIES OF THE FEATURE OBSERVATION, DISTANCES ARE SCALED BY THE BOARD SIZE
+FEATURES = ("food_dx", "food_dy", "food_distance", "length")
+
+Observation = Dict[str, np.ndarray]
+
+
+class SnakeEnv:
+    """
+    Gymnasium style environment over SnakeGame: reset(seed) -> (observation, info) and
+    step(action) -> (observation, reward, terminated, truncated, info), actions being Direction values.
+    The game ends (terminated) on an invalid move or a full board. truncated is set after max_steps moves.
+
+    The observation is a dict of preallocated buffers that every step updates in place from the cells that moved:
+    - "board": float32 (3, height, width) one-hot channels HEAD, BODY and FOOD
+    - "features": float32 FEATURES vector
+    - "valid": bool mask of the moves valid_actions allows, indexed by Direction value
+    The same arrays (and the same info dict) are returned by every call, copy them to keep an observation.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        max_steps: Optional[int] = None,
+        food_reward: float = 1.0,
+        death_reward: float = -1.0,
+        step_reward: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.width = width
+        self.height = height
+        self.max_steps = max_steps
+        self.food_reward = food_reward
+        self.death_reward = death_reward
+        self.step_reward = step_reward
+        # DRAWS THE GAME SEEDS OF reset() CALLS WITHOUT ONE
+        self.random = random.Random(seed)
+        self.game = SnakeGame(width, height, seed=self.random.getrandbits(32))
+
+        self.n_actions = len(Direction)
+        self.board = np.zeros((3, height, width), dtype=np.float32)
+        self.features = np.zeros(len(FEATURES), dtype=np.float32)
+        self.valid = np.zeros(self.n_actions, dtype=bool)
+        self.observation: Observation = {"board": self.board, "features": self.features, "valid": self.valid}
+        self.info: Dict[str, Any] = {}
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[Observation, Dict[str, Any]]:
+        self.game = SnakeGame(self.width, self.height, seed=seed if seed is not None else self.random.getrandbits(32))
+
+        self.board.fill(0)
+        for node in self.game.snake.body:
+            self.board[BODY, node.y, node.x] = 1
+        head_x, head_y = self.game.snake.head.get_position()
+        self.board[BODY, head_y, head_x] = 0
+        self.board[HEAD, head_y, head_x] = 1
+        food_x, food_y = self.game.food_pos
+        self.board[FOOD, food_y, food_x] = 1
+
+        self._update_features()
+        self._update_info(False)
+        return self.observation, self.info
+
+    def step(self, action: Union[int, Direction]) -> Tuple[Observation, float, bool, bool, Dict[str, Any]]:
+        game = self.game
+        board = self.board
+        old_head_x, old_head_y = game.snake.head.get_position()
+        old_tail_x, old_tail_y = game.snake.tail.get_position()
+        old_food_x, old_food_y = game.food_pos
+        old_length = game.length
+
+        moved = game.check_valid(Direction(action))
+        terminated = game.make_move(Direction(action))
+        reward = self.step_reward
+        if moved:
+            ate = game.length > old_length
+            if ate:
+                reward += self.food_reward
+                board[FOOD, old_food_y, old_food_x] = 0
+                food_x, food_y = game.food_pos
+                board[FOOD, food_y, food_x] = 1
+            elif old_length > 1:
+                board[BODY, old_tail_y, old_tail_x] = 0
+            board[HEAD, old_head_y, old_head_x] = 0
+            if game.length > 1:
+                board[BODY, old_head_y, old_head_x] = 1
+            head_x, head_y = game.snake.head.get_position()
+            board[HEAD, head_y, head_x] = 1
+            board[BODY, head_y, head_x] = 0
+        else:
+            reward += self.death_reward
+
+        self._update_features()
+        self._update_info(moved)
+        truncated = not terminated and self.max_steps is not None and game.move_count >= self.max_steps
+        return self.observation, reward, terminated, truncated, self.info
+
+    def _update_features(self) -> None:
+        game = self.game
+        head_x, head_y = game.snake.head.get_position()
+        food_x, food_y = game.food_pos
+        features = self.features
+        features[0] = (food_x - head_x) / self.width
+        features[1] = (food_y - head_y) / self.height
+        features[2] = (abs(food_x - head_x) + abs(food_y - head_y)) / (self.width + self.height)
+        features[3] = game.length / game.max_length
+        valid_mask = game.valid_actions()
+        for bit in range(self.n_actions):
+            self.valid[bit] = valid_mask >> bit & 1
+
+    def _update_info(self, moved: bool) -> None:
+        info = self.info
+        info["length"] = self.game.length
+        info["move_count"] = self.game.move_count
+        info["perfect"] = self.game.length == self.game.max_length
+        info["valid_move"] = moved
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import enum
 import random
-from typing import Optional, Tuple
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Deque, List, NamedTuple, Optional, Protocol, Sequence, Tuple
 
 import numpy as np
 
-random.seed(10)
-
 
 class Direction(enum.Enum):
     UP = 0
@@ -17,8 +18,7 @@ class Direction(enum.Enum):
 
 
 class BodyNode:
-    def __init__(self, parent: Optional[BodyNode], x: int, y: int):
-        self.parent = parent
+    def __init__(self, x: int, y: int):
         self.x = x
         self.y = y
 
@@ -28,9 +28,6 @@ class BodyNode:
     def set_y(self, y: int) -> None:
         self.y = y
 
-    def set_parent(self, parent: BodyNode) -> None:
-        self.parent = parent
-
     def get_position(self) -> Tuple[int, int]:
         return (self.x, self.y)
 
@@ -40,35 +37,39 @@ class BodyNode:
 
 class Snake:
     def __init__(self, x: int, y: int):
-        self.head = BodyNode(None, x, y)
-        self.tail = self.head
+        # BODY IS ORDERED FROM TAIL (LEFT) TO HEAD (RIGHT)
+        # A MOVE PUSHES A NEW HEAD AND POPS THE TAIL, SO EVERY STEP IS O(1) REGARDLESS OF LENGTH
+        self.body: Deque[BodyNode] = deque([BodyNode(x, y)])
+
+    @property
+    def head(self) -> BodyNode:
+        return self.body[-1]
 
-    def move_body_foward(self) -> None:
-        current_node = self.tail
-        while current_node.parent is not None:
-            parentPosition = current_node.parent.get_position()
-            current_node.set_x(parentPosition[0])
-            current_node.set_y(parentPosition[1])
-            current_node = current_node.parent
+    @property
+    def tail(self) -> BodyNode:
+        return self.body[0]
 
     def move(self, direction: Direction) -> Tuple[int, int, int, int]:
         (old_tail_x, old_tail_y) = self.tail.get_position()
-        self.move_body_foward()
-        head_position = self.head.get_position()
+        (new_x, new_y) = self.head.get_position()
         if direction == Direction.UP:
-            self.head.set_y(head_position[1] - 1)
+            new_y -= 1
         elif direction == Direction.RIGHT:
-            self.head.set_x(head_position[0] + 1)
+            new_x += 1
         elif direction == Direction.DOWN:
-            self.head.set_y(head_position[1] + 1)
+            new_y += 1
         elif direction == Direction.LEFT:
-            self.head.set_x(head_position[0] - 1)
-        return (old_tail_x, old_tail_y, *self.head.get_position())
+            new_x -= 1
+
+        # RECYCLE THE OLD TAIL NODE AS THE NEW HEAD
+        node = self.body.popleft()
+        node.set_x(new_x)
+        node.set_y(new_y)
+        self.body.append(node)
+        return (old_tail_x, old_tail_y, new_x, new_y)
 
     def new_head(self, new_x: int, new_y: int):
-        new_head = BodyNode(None, new_x, new_y)
-        self.head.set_parent(new_head)
-        self.head = new_head
+        self.body.append(BodyNode(new_x, new_y))
 
     def get_head(self) -> BodyNode:
         return self.head
@@ -76,9 +77,80 @@ class Snake:
     def get_tail(self) -> BodyNode:
         return self.tail
 
+    def __len__(self) -> int:
+        return len(self.body)
+
+
+class SnakeBody(Protocol):
+    # WHAT THE SHARED RULES AND THE SOLUTIONS READ OF A SNAKE, Snake AND bitboard.RingSnake BOTH PROVIDE IT
+    @property
+    def head(self) -> BodyNode:
+        ...
+
+    @property
+    def tail(self) -> BodyNode:
+        ...
 
-class SnakeGame:
-    def __init__(self, width: int, height: int, starting_food: bool = False):
+    @property
+    def body(self) -> Sequence[BodyNode]:
+        ...
+
+    def get_head(self) -> BodyNode:
+        ...
+
+    def get_tail(self) -> BodyNode:
+        ...
+
+    def __len__(self) -> int:
+        ...
+
+
+class GameSnapshot(NamedTuple):
+    # FLAT COPIES OF EVERYTHING A MOVE CAN CHANGE, THE BODY AS (x, y) PAIRS FROM TAIL TO HEAD
+    board: np.ndarray
+    free_cells: List[int]
+    free_slots: List[int]
+    blocked: bytes
+    body: Tuple[Tuple[int, int], ...]
+    food_index: Tuple[int, int]
+    length: int
+    move_count: int
+    random_state: Any
+
+
+class UndoEntry(NamedTuple):
+    # LOGGED BY push_move, WHAT pop_move NEEDS TO TAKE A MOVE BACK. THE REST FOLLOWS FROM THE BODY AFTER THE MOVE
+    valid: bool
+    ate: bool
+    old_tail: Tuple[int, int]
+    old_food_index: Tuple[int, int]
+    # INDEX IN free_cells THE NEW HEAD CELL WAS SWAP-REMOVED FROM
+    head_slot: int
+    # ONLY KEPT WHEN THE MOVE ATE, THE RNG IS ONLY DRAWN FROM TO SPAWN FOOD
+    random_state: Any
+
+
+def padded_walls(width: int, height: int) -> bytearray:
+    # (width + 2) x (height + 2) CELLS, 1 ON THE BORDER AND 0 INSIDE
+    padded_width = width + 2
+    blocked = bytearray([1]) * (padded_width * (height + 2))
+    for y in range(1, height + 1):
+        blocked[y * padded_width + 1 : (y + 1) * padded_width - 1] = bytes(width)
+    return blocked
+
+
+class BaseSnakeGame(ABC):
+    """
+    Rules and interface shared by the game backends, SnakeGame and bitboard.BitboardSnakeGame. A backend keeps the
+    board, the snake and the free cells its own way and implements the moves on them. Snapshots and undo entries
+    are the same in every backend, so one backend can restore another's snapshot.
+    """
+
+    snake: SnakeBody
+    food_index: Tuple[int, int]
+    food_pos: Tuple[int, int]
+
+    def __init__(self, width: int, height: int, seed: Optional[int] = None):
         # arbitrary numbers to signify head, body, and food)
         # 0 for empty space
         self.head_val = 5
@@ -86,54 +158,53 @@ class SnakeGame:
         self.food_val = 9
         self.width = width
         self.height = height
-        self.board = np.zeros([height, width], dtype=int)
+        # PER GAME RNG SO GAMES RUNNING SIDE BY SIDE DO NOT SHARE A STREAM
+        self.seed = seed
+        self.random = random.Random(seed)
 
         self.length = 1
+        self.max_length = width * height - 1
+        self.move_count = 0
+        self.undo_log: List[UndoEntry] = []
 
-        start_x = width // 2
-        start_y = height // 2
+    @property
+    @abstractmethod
+    def board(self) -> np.ndarray:
+        # (height, width) ARRAY OF head_val, body_val, food_val AND 0 FOR EMPTY CELLS
+        ...
 
-        self.board[start_x, start_y] = self.head_val
-        self.snake = Snake(start_x, start_y)
+    @abstractmethod
+    def spawn_food(self) -> None:
+        ...
 
-        if starting_food:
-            self.initial_spawn_food()
-            self.make_move(Direction.DOWN)
-        else:
-            self.spawn_food()
+    @abstractmethod
+    def check_valid(self, direction: Direction) -> bool:
+        ...
 
-        self.max_length = width * height - 1
-        self.move_count = 0
+    @abstractmethod
+    def valid_actions(self) -> int:
+        ...
 
-    def initial_spawn_food(self) -> None:
-        self.food_index = self.snake.head.get_position()[0] + 1, self.snake.head.get_position()[1]
-        self.board[self.food_index] = self.food_val
+    @abstractmethod
+    def make_move(self, direction: Direction) -> bool:
+        ...
 
-    def spawn_food(self) -> None:
-        # spawn food at location not occupied by snake
-        empty_cells = []
-        for index, value in np.ndenumerate(self.board):
-            if value != self.body_val and value != self.head_val:
-                empty_cells.append(index)
-        self.food_index = random.choice(empty_cells)  # type: ignore
-        self.food_pos = self.food_index[1], self.food_index[0]
-        self.board[self.food_index] = self.food_val
-
-    def check_valid(self, direction: Direction):
-        # check if move is blocked by wall
-        new_x, new_y = self.potential_position(direction)
-        if new_x == -1 or new_x == self.width:
-            return False
-        if new_y == -1 or new_y == self.height:
-            return False
-
-        # check if move is blocked by snake body
-        if self.board[new_y, new_x] == self.body_val:
-            # IF BLOCKED BY TAIL AND LENGTH > 2, THEN TAIL WILL MOVE OUT OF THE WAY AND IT IS FINE
-            if (new_x, new_y) == self.snake.tail.get_position() and self.length > 2:
-                return True
-            return False
-        return True
+    @abstractmethod
+    def snapshot(self) -> GameSnapshot:
+        ...
+
+    @abstractmethod
+    def restore(self, snapshot: GameSnapshot, restore_random: bool = True) -> None:
+        # restore_random=False KEEPS THE RNG AS IT IS, FOR SEARCHES THAT SPAWN FOOD FROM THEIR OWN RNG
+        ...
+
+    @abstractmethod
+    def push_move(self, direction: Direction) -> bool:
+        ...
+
+    @abstractmethod
+    def pop_move(self) -> None:
+        ...
 
     def potential_position(self, direction: Direction):
         (new_x, new_y) = self.snake.get_head().get_position()
@@ -147,46 +218,188 @@ class SnakeGame:
             new_x -= 1
         return (new_x, new_y)
 
+    def cell_char(self, value: int) -> str:
+        if value == self.head_val:
+            return "O"
+        if value == self.body_val:
+            return "X"
+        if value == self.food_val:
+            return "*"
+        return " "
+
+    def render(self) -> str:
+        # WHOLE FRAME AS ONE STRING, BOARD INSIDE A BORDER
+        border = "-" * (self.width + 2)
+        rows = ["|" + "".join(self.cell_char(value) for value in row) + "|" for row in self.board.tolist()]
+        return "\n".join([border, *rows, border]) + "\n"
+
     def display(self):
-        for i in range(self.width + 2):
-            print("-", end="")
-        for i in range(self.height):
-            print("\n|", end="")
-            for j in range(self.width):
-                if self.board[i, j] == 0:
-                    print(" ", end="")
-                elif self.board[i, j] == self.head_val:
-                    print("O", end="")
-                elif self.board[i, j] == self.body_val:
-                    print("X", end="")
-                elif self.board[i, j] == self.food_val:
-                    print("*", end="")
-            print("|", end="")
-        print()
-        for i in range(self.width + 2):
-            print("-", end="")
-        print()
-
-    def make_move(self, direction: Direction):
+        sys.stdout.write(self.render())
+
+
+class SnakeGame(BaseSnakeGame):
+    snake: Snake
+
+    def __init__(self, width: int, height: int, starting_food: bool = False, seed: Optional[int] = None):
+        super().__init__(width, height, seed)
+        self.grid = np.zeros([height, width], dtype=int)
+
+        start_x = width // 2
+        start_y = height // 2
+
+        self.grid[start_y, start_x] = self.head_val
+        self.snake = Snake(start_x, start_y)
+
+        # CELLS NOT OCCUPIED BY THE SNAKE, KEPT AS A SWAP-REMOVE ARRAY OF CELL IDS (y * width + x)
+        # free_slots MAPS A CELL ID TO ITS INDEX IN free_cells, OR -1 IF THE CELL IS OCCUPIED
+        self.free_cells = list(range(width * height))
+        self.free_slots = list(range(width * height))
+        # SNAKE CELLS ON A BOARD PADDED WITH A ONE CELL WALL, SO A WALL CHECK IS THE SAME LOOKUP AS A BODY CHECK
+        # THE PADDED ID OF (x, y) IS (y + 1) * (width + 2) + x + 1 AND neighbour_offsets ARE INDEXED BY Direction.value
+        self.blocked = padded_walls(width, height)
+        self.neighbour_offsets = (-(width + 2), 1, width + 2, -1)
+        self.occupy_cell(start_x, start_y)
+
+        if starting_food:
+            self.initial_spawn_food()
+            self.make_move(Direction.DOWN)
+            self.move_count = 0
+        else:
+            self.spawn_food()
+
+    @property
+    def board(self) -> np.ndarray:
+        # THE ARRAY THE GAME UPDATES IN PLACE, NOT A COPY
+        return self.grid
+
+    def initial_spawn_food(self) -> None:
+        self.food_index = self.snake.head.get_position()[0] + 1, self.snake.head.get_position()[1]
+        self.grid[self.food_index] = self.food_val
+
+    def occupy_cell(self, x: int, y: int) -> None:
+        cell = y * self.width + x
+        slot = self.free_slots[cell]
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[slot] = last
+            self.free_slots[last] = slot
+        self.free_slots[cell] = -1
+        self.blocked[cell + y * 2 + self.width + 3] = 1
+
+    def release_cell(self, x: int, y: int) -> None:
+        cell = y * self.width + x
+        self.free_slots[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+        self.blocked[cell + y * 2 + self.width + 3] = 0
+
+    def unoccupy_cell(self, x: int, y: int, slot: int) -> None:
+        # INVERSE OF occupy_cell, slot BEING THE INDEX THE CELL HAD IN free_cells
+        cell = y * self.width + x
+        if slot < len(self.free_cells):
+            last = self.free_cells[slot]
+            self.free_slots[last] = len(self.free_cells)
+            self.free_cells.append(last)
+            self.free_cells[slot] = cell
+        else:
+            self.free_cells.append(cell)
+        self.free_slots[cell] = slot
+        self.blocked[cell + y * 2 + self.width + 3] = 0
+
+    def unrelease_cell(self, x: int, y: int) -> None:
+        # INVERSE OF release_cell, THE CELL IS THE LAST ONE IN free_cells
+        cell = self.free_cells.pop()
+        self.free_slots[cell] = -1
+        self.blocked[cell + y * 2 + self.width + 3] = 1
+
+    def snapshot(self) -> GameSnapshot:
+        """
+        Copies the state, RNG included, into flat arrays and tuples. A snapshot can be restored any number of times
+        and costs a few array copies instead of a deepcopy of the board and the BodyNode chain.
+        """
+        return GameSnapshot(
+            self.grid.copy(),
+            list(self.free_cells),
+            list(self.free_slots),
+            bytes(self.blocked),
+            tuple(node.get_position() for node in self.snake.body),
+            self.food_index,
+            self.length,
+            self.move_count,
+            self.random.getstate(),
+        )
+
+    def restore(self, snapshot: GameSnapshot, restore_random: bool = True) -> None:
+        # BACK TO THE EXACT STATE OF snapshot, COPYING INTO THE EXISTING BUFFERS SO THE SNAPSHOT STAYS UNTOUCHED
+        np.copyto(self.grid, snapshot.board)
+        self.free_cells[:] = snapshot.free_cells
+        self.free_slots[:] = snapshot.free_slots
+        self.blocked[:] = snapshot.blocked
+        self.snake.body = deque(BodyNode(x, y) for x, y in snapshot.body)
+        self.food_index = snapshot.food_index
+        self.food_pos = snapshot.food_index[1], snapshot.food_index[0]
+        self.length = snapshot.length
+        self.move_count = snapshot.move_count
+        if restore_random:
+            self.random.setstate(snapshot.random_state)
+
+    def spawn_food(self) -> None:
+        # spawn food at location not occupied by snake
+        food_y, food_x = divmod(self.random.choice(self.free_cells), self.width)
+        self.food_index = food_y, food_x
+        self.food_pos = food_x, food_y
+        self.grid[self.food_index] = self.food_val
+
+    def check_valid(self, direction: Direction) -> bool:
+        # ONE LOOKUP OF THE PADDED BOARD, SEE valid_actions
+        head_x, head_y = self.snake.head.get_position()
+        cell = (head_y + 1) * (self.width + 2) + head_x + 1 + self.neighbour_offsets[direction.value]
+        if not self.blocked[cell]:
+            return True
+        # IF BLOCKED BY TAIL AND LENGTH > 2, THEN TAIL WILL MOVE OUT OF THE WAY AND IT IS FINE
+        tail_x, tail_y = self.snake.tail.get_position()
+        return self.length > 2 and cell == (tail_y + 1) * (self.width + 2) + tail_x + 1
+
+    def valid_actions(self) -> int:
+        """
+        4-bit mask of the valid moves, bit i set if the move in Direction(i) is valid.
+        Walls and the body are blocked cells of the padded board, except the tail when length > 2:
+        it moves out of the way.
+        """
+        head_x, head_y = self.snake.head.get_position()
+        head = (head_y + 1) * (self.width + 2) + head_x + 1
+        tail_x, tail_y = self.snake.tail.get_position()
+        tail = (tail_y + 1) * (self.width + 2) + tail_x + 1 if self.length > 2 else -1
+        blocked = self.blocked
+        mask = 0
+        for bit, offset in enumerate(self.neighbour_offsets):
+            cell = head + offset
+            if not blocked[cell] or cell == tail:
+                mask |= 1 << bit
+        return mask
+
+    def make_move(self, direction: Direction) -> bool:
         game_over = False
         if self.check_valid(direction):
             (head_x, head_y) = self.snake.get_head().get_position()
             # set old head to body val
-            self.board[head_y, head_x] = self.body_val
+            self.grid[head_y, head_x] = self.body_val
 
             # check if we got the fruit
             potX, potY = self.potential_position(direction)
-            if self.board[potY, potX] == self.food_val:
+            if self.grid[potY, potX] == self.food_val:
                 # extend the snake
                 self.snake.new_head(potX, potY)
-                self.board[potY, potX] = self.head_val
+                self.grid[potY, potX] = self.head_val
+                self.occupy_cell(potX, potY)
                 self.spawn_food()
                 self.length += 1
             else:
                 # move the snake
                 (old_tail_x, old_tail_y, new_head_x, new_head_y) = self.snake.move(direction)
-                self.board[old_tail_y, old_tail_x] = 0
-                self.board[new_head_y, new_head_x] = self.head_val
+                self.grid[old_tail_y, old_tail_x] = 0
+                self.grid[new_head_y, new_head_x] = self.head_val
+                self.release_cell(old_tail_x, old_tail_y)
+                self.occupy_cell(new_head_x, new_head_y)
         else:
             game_over = True
 
@@ -196,3 +409,59 @@ class SnakeGame:
         self.move_count += 1
 
         return game_over
+
+    def push_move(self, direction: Direction) -> bool:
+        """
+        make_move that logs an undo entry, so pop_move can take it back. Moves are taken back last in, first out
+        and every pop restores the exact state before the move: board, body, free cells in order, food and RNG.
+        """
+        head_slot = -1
+        ate = False
+        valid = self.check_valid(direction)
+        if valid:
+            new_x, new_y = self.potential_position(direction)
+            head_slot = self.free_slots[new_y * self.width + new_x]
+            if head_slot == -1:
+                # MOVING ONTO THE TAIL: ITS CELL IS RELEASED TO THE END OF free_cells, THEN TAKEN FROM THERE
+                head_slot = len(self.free_cells)
+            ate = (new_x, new_y) == self.food_pos
+        self.undo_log.append(
+            UndoEntry(
+                valid,
+                ate,
+                self.snake.tail.get_position(),
+                self.food_index,
+                head_slot,
+                self.random.getstate() if ate else None,
+            )
+        )
+        return self.make_move(direction)
+
+    def pop_move(self) -> None:
+        entry = self.undo_log.pop()
+        self.move_count -= 1
+        if not entry.valid:
+            return
+
+        head = self.snake.body.pop()
+        head_x, head_y = head.get_position()
+        self.unoccupy_cell(head_x, head_y, entry.head_slot)
+        if entry.ate:
+            self.grid[self.food_index] = 0
+            self.grid[head_y, head_x] = self.food_val
+            self.food_index = entry.old_food_index
+            self.food_pos = entry.old_food_index[1], entry.old_food_index[0]
+            self.random.setstate(entry.random_state)
+            self.length -= 1
+        else:
+            # RECYCLE THE HEAD NODE AS THE OLD TAIL
+            tail_x, tail_y = entry.old_tail
+            self.grid[head_y, head_x] = 0
+            self.unrelease_cell(tail_x, tail_y)
+            head.set_x(tail_x)
+            head.set_y(tail_y)
+            self.snake.body.appendleft(head)
+            self.grid[tail_y, tail_x] = self.body_val
+
+        old_head_x, old_head_y = self.snake.head.get_position()
+        self.grid[old_head_y, old_head_x] = self.head_val
@@ -0,0 +1,191 @@
+import importlib.util
+from functools import lru_cache
+from typing import Callable, NamedTuple
+
+import numpy as np
+
+from snake.algorithms.grid_search import neighbour_array
+
+# "python" RUNS THE USUAL CODE, "numba" THE KERNELS BELOW COMPILED IN NOPYTHON MODE. BOTH GIVE THE SAME RESULTS
+BACKENDS = ("python", "numba")
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+_backend = "python"
+
+
+def set_backend(name: str) -> str:
+    """
+    Selects the backend used from now on: "python", "numba" or "auto" (numba if it is installed).
+    Returns the backend selected.
+    """
+    global _backend
+    if name == "auto":
+        name = "numba" if NUMBA_AVAILABLE else "python"
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name!r}, expected one of {BACKENDS} or 'auto'")
+    if name == "numba" and not NUMBA_AVAILABLE:
+        raise ImportError("The numba backend needs numba, install it or use the python backend")
+    _backend = name
+    return name
+
+
+def get_backend() -> str:
+    return _backend
+
+
+# THE KERNELS ONLY USE WHAT numba COMPILES IN NOPYTHON MODE: LOOPS, SCALARS AND NUMPY ARRAYS
+
+
+def step_games(
+    padded,
+    neighbours,
+    bodies,
+    head_ptrs,
+    tail_ptrs,
+    heads,
+    tails,
+    lengths,
+    move_counts,
+    done,
+    directions,
+    ate,
+    head_val,
+    body_val,
+    food_val,
+    max_length,
+):
+    """
+    BatchSnakeGame.step for every game that is not done, one game at a time. Arrays are the BatchSnakeGame ones and
+    are updated in place, ate[k] is set for the games that ate. Food is left to the caller.
+    """
+    capacity = bodies.shape[1]
+    for k in range(padded.shape[0]):
+        ate[k] = False
+        if done[k]:
+            continue
+        move_counts[k] += 1
+
+        # CHECK IF MOVE IS BLOCKED BY WALL OR SNAKE BODY, UNLESS IT IS THE TAIL AND IT WILL MOVE OUT OF THE WAY
+        new_cell = neighbours[heads[k], directions[k]]
+        target = padded[k, new_cell]
+        if target == body_val and not (new_cell == tails[k] and lengths[k] > 2):
+            done[k] = True
+            continue
+
+        # OLD HEAD BECOMES BODY AND THE TAIL IS CLEARED BEFORE THE NEW HEAD IS WRITTEN
+        padded[k, heads[k]] = body_val
+        if target != food_val:
+            padded[k, tails[k]] = 0
+        head_ptrs[k] = (head_ptrs[k] + 1) % capacity
+        bodies[k, head_ptrs[k]] = new_cell
+        heads[k] = new_cell
+        padded[k, new_cell] = head_val
+
+        if target == food_val:
+            ate[k] = True
+            lengths[k] += 1
+            if lengths[k] == max_length:
+                done[k] = True
+        else:
+            tail_ptrs[k] = (tail_ptrs[k] + 1) % capacity
+            tails[k] = bodies[k, tail_ptrs[k]]
+
+
+def cycle_mask(cells, order, head, food, head_order, tail_order, food_order, passable):
+    """
+    prepare_graph on a flat board: passable[cell] is set for empty cells plus head and food whose cycle order
+    neither overtakes the tail nor the food.
+    """
+    for cell in range(cells.shape[0]):
+        cell_order = order[cell]
+        allowed = cells[cell] == 0 or cell == head or cell == food
+
+        # CANNOT OVERTAKE TAIL
+        if head_order > tail_order:
+            allowed = allowed and (cell_order <= tail_order or cell_order >= head_order)
+        elif head_order < tail_order:
+            allowed = allowed and head_order <= cell_order and cell_order <= tail_order
+
+        # CANNOT OVERTAKE FOOD
+        if head_order < food_order:
+            allowed = allowed and head_order <= cell_order and cell_order <= food_order
+        else:
+            allowed = allowed and (cell_order <= food_order or cell_order >= head_order)
+
+        passable[cell] = allowed
+
+
+def bfs_cells(passable, neighbours, start, end, parents, queue):
+    """
+    grid_search.bfs on cell ids with a preallocated queue: fills parents (-1 for unreached) and returns whether
+    end was reached. neighbours is grid_search.neighbour_array, visited in the same order, so the path is the same.
+    """
+    n_cells = passable.shape[0]
+    parents[:] = -1
+    parents[start] = start
+    if start == end:
+        return True
+    queue[0] = start
+    read = 0
+    write = 1
+    while read < write:
+        cell = queue[read]
+        read += 1
+        for i in range(4):
+            neighbour = neighbours[cell, i]
+            if neighbour < n_cells and parents[neighbour] == -1 and passable[neighbour]:
+                parents[neighbour] = cell
+                if neighbour == end:
+                    return True
+                queue[write] = neighbour
+                write += 1
+    return False
+
+
+class Kernels(NamedTuple):
+    step_games: Callable[..., None]
+    cycle_mask: Callable[..., None]
+    bfs_cells: Callable[..., bool]
+
+
+@lru_cache(maxsize=None)
+def compiled_kernels() -> Kernels:
+    # COMPILED ON FIRST USE AND CACHED ON DISK BY numba
+    try:
+        import numba
+    except ImportError as e:
+        raise ImportError("The numba backend needs numba, install it or use the python backend") from e
+    jit = numba.njit(cache=True)
+    return Kernels(jit(step_games), jit(cycle_mask), jit(bfs_cells))
+
+
+def warm_up() -> None:
+    # RUNS EVERY COMPILED KERNEL ONCE ON A 2x2 BOARD SO COMPILATION IS NOT TIMED
+    kernels = compiled_kernels()
+    neighbours = neighbour_array(2, 2)
+    passable = np.ones(4, dtype=bool)
+    kernels.cycle_mask(np.zeros(4, dtype=np.int64), np.arange(4), 0, 3, 0, 0, 3, passable)
+    kernels.bfs_cells(passable, neighbours, 0, 3, np.empty(4, dtype=np.int64), np.empty(4, dtype=np.int64))
+
+    padded = np.zeros((1, 5), dtype=np.int8)
+    padded[0, 4] = 1
+    padded[0, 0] = 5
+    games = np.zeros(1, dtype=np.int64)
+    kernels.step_games(
+        padded,
+        neighbours,
+        np.zeros((1, 4), dtype=np.int64),
+        games.copy(),
+        games.copy(),
+        games.copy(),
+        games.copy(),
+        np.ones(1, dtype=np.int64),
+        games.copy(),
+        np.zeros(1, dtype=bool),
+        np.ones(1, dtype=np.int64),
+        np.zeros(1, dtype=bool),
+        5,
+        1,
+        9,
+        3,
+    )
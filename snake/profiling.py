@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from snake.game import SnakeGame
+    from snake.solutions.base import BaseSolution
+
+# HISTOGRAM BUCKET i HOLDS DURATIONS IN [2^(i-1), 2^i) NANOSECONDS
+N_BUCKETS = 48
+
+
+class PhaseTimer:
+    """
+    Per phase call counters, total time and log2 histograms of perf_counter_ns durations.
+    Phases can nest (a "move" includes its "check_valid" and "spawn"), so totals do not add up to the run time.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = {}
+        self.totals: Dict[str, int] = {}
+        self.histograms: Dict[str, List[int]] = {}
+
+    def record(self, phase: str, elapsed_ns: int) -> None:
+        if phase not in self.counts:
+            self.counts[phase] = 0
+            self.totals[phase] = 0
+            self.histograms[phase] = [0] * N_BUCKETS
+        self.counts[phase] += 1
+        self.totals[phase] += elapsed_ns
+        self.histograms[phase][min(elapsed_ns.bit_length(), N_BUCKETS - 1)] += 1
+
+    def merge(self, other: PhaseTimer) -> None:
+        for phase, count in other.counts.items():
+            if phase not in self.counts:
+                self.counts[phase] = 0
+                self.totals[phase] = 0
+                self.histograms[phase] = [0] * N_BUCKETS
+            self.counts[phase] += count
+            self.totals[phase] += other.totals[phase]
+            self.histograms[phase] = [a + b for a, b in zip(self.histograms[phase], other.histograms[phase])]
+
+    def quantile(self, phase: str, q: float) -> int:
+        # UPPER BOUND (IN NS) OF THE BUCKET HOLDING THE q-TH QUANTILE
+        target = q * self.counts[phase]
+        seen = 0
+        for i, count in enumerate(self.histograms[phase]):
+            seen += count
+            if count and seen >= target:
+                return 1 << i
+        return 1 << (N_BUCKETS - 1)
+
+    def summary(self) -> str:
+        lines = [
+            "{:<12} {:>10} {:>12} {:>10} {:>10} {:>10}".format(
+                "phase", "count", "total ms", "mean ns", "p50 ns", "p99 ns"
+            )
+        ]
+        for phase in sorted(self.counts, key=lambda phase: self.totals[phase], reverse=True):
+            count, total = self.counts[phase], self.totals[phase]
+            lines.append(
+                "{:<12} {:>10} {:>12.3f} {:>10} {:>10} {:>10}".format(
+                    phase,
+                    count,
+                    total / 1e6,
+                    total // count,
+                    "<{}".format(self.quantile(phase, 0.5)),
+                    "<{}".format(self.quantile(phase, 0.99)),
+                )
+            )
+        return "\n".join(lines)
+
+
+def _timed(timer: PhaseTimer, phase: str, method: Callable[..., Any]) -> Callable[..., Any]:
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        result = method(*args, **kwargs)
+        timer.record(phase, perf_counter_ns() - start)
+        return result
+
+    return wrapper
+
+
+def instrument_game(game: SnakeGame, timer: PhaseTimer) -> None:
+    """
+    Wraps the game's methods on the instance only, so games that are not instrumented pay nothing.
+    "decide" is the time the solution spends between two moves (planning and display included).
+    """
+    make_move = game.make_move
+    last_move_end: List[Optional[int]] = [None]
+
+    def timed_make_move(direction):
+        start = perf_counter_ns()
+        if last_move_end[0] is not None:
+            timer.record("decide", start - last_move_end[0])
+        game_over = make_move(direction)
+        last_move_end[0] = perf_counter_ns()
+        timer.record("move", last_move_end[0] - start)
+        return game_over
+
+    game.make_move = timed_make_move  # type: ignore
+    game.spawn_food = _timed(timer, "spawn", game.spawn_food)  # type: ignore
+    game.check_valid = _timed(timer, "check_valid", game.check_valid)  # type: ignore
+    game.display = _timed(timer, "display", game.display)  # type: ignore
+
+
+def instrument(solution: BaseSolution, timer: Optional[PhaseTimer] = None) -> PhaseTimer:
+    """
+    Turns on phase timing for a solution and its game. Solutions that plan (ShortestPathSolution)
+    additionally record a "plan" phase through solution.timer.
+    """
+    timer = timer if timer is not None else PhaseTimer()
+    solution.timer = timer
+    instrument_game(solution.game, timer)
+    return timer
+
+
+def profile_run(solution: BaseSolution, path: Optional[str] = None) -> pstats.Stats:
+    # RUN THE SOLUTION UNDER cProfile, OPTIONALLY DUMPING A pstats FILE
+    profiler = cProfile.Profile()
+    profiler.runcall(solution.run)
+    if path is not None:
+        profiler.dump_stats(path)
+    return pstats.Stats(profiler)
@@ -0,0 +1,64 @@
+import sys
+from time import perf_counter
+from typing import Optional, TextIO
+
+import numpy as np
+
+from snake.game import SnakeGame
+
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+
+class TerminalRenderer:
+    """
+    Draws a game with a single write per frame.
+    In ANSI mode the first frame is drawn in full and later frames only repaint the cells that changed since the
+    last drawn frame (usually old tail, old head, new head and food). Without ANSI every frame is written in full.
+    With fps set, frames requested faster than the target rate are dropped, so drawing does not slow the game down.
+    """
+
+    def __init__(self, ansi: bool = True, fps: Optional[float] = None, stream: Optional[TextIO] = None):
+        self.ansi = ansi
+        self.frame_interval = 1 / fps if fps else 0.0
+        self.stream = stream if stream is not None else sys.stdout
+        self.last_board: Optional[np.ndarray] = None
+        self.last_frame_time = float("-inf")
+        self.frames = 0
+
+    def render(self, game: SnakeGame, force: bool = False) -> bool:
+        # RETURNS WHETHER A FRAME WAS DRAWN
+        now = perf_counter()
+        if not force and now - self.last_frame_time < self.frame_interval:
+            return False
+        self.last_frame_time = now
+
+        if not self.ansi:
+            frame = game.render()
+        elif self.last_board is None or self.last_board.shape != game.board.shape:
+            frame = CLEAR_SCREEN + game.render()
+        else:
+            frame = self.diff(game, self.last_board)
+
+        if self.ansi:
+            # PARK THE CURSOR UNDER THE BOARD AND KEEP THE STATUS LINE UP TO DATE
+            frame += "\x1b[{};1H\x1b[2KLength {}\n".format(game.height + 3, game.length)
+            if self.last_board is None or self.last_board.shape != game.board.shape:
+                self.last_board = game.board.copy()
+            else:
+                self.last_board[...] = game.board
+        else:
+            frame += "Length {}\n".format(game.length)
+
+        self.stream.write(frame)
+        self.stream.flush()
+        self.frames += 1
+        return True
+
+    @staticmethod
+    def diff(game: SnakeGame, last_board: np.ndarray) -> str:
+        # ANSI ROWS AND COLUMNS ARE 1-BASED AND THE BOARD SITS INSIDE A ONE CELL BORDER
+        ys, xs = np.nonzero(game.board != last_board)
+        board = game.board
+        return "".join(
+            "\x1b[{};{}H{}".format(y + 2, x + 2, game.cell_char(board[y, x])) for y, x in zip(ys.tolist(), xs.tolist())
+        )
@@ -0,0 +1,164 @@
+import copy
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from snake.game import Direction, SnakeGame
+from snake.solutions.base import BaseSolution
+from snake.solutions.observers import Observer
+
+# A REPLAY FILE IS A SEQUENCE OF RECORDS, SO GAMES CAN BE APPENDED TO AN EXISTING FILE
+# RECORD: MAGIC, WIDTH, HEIGHT, SEED, MOVE COUNT, THEN THE MOVES PACKED 4 PER BYTE (2 BITS EACH, FIRST MOVE IN THE
+# LOWEST BITS) USING Direction VALUES
+RECORD_MAGIC = b"SNKG"
+RECORD_HEADER = struct.Struct("<4sHHqI")
+KEYFRAME_INTERVAL = 256
+
+
+def pack_moves(moves: Sequence[int]) -> bytes:
+    padded = np.zeros(-(-len(moves) // 4) * 4, dtype=np.uint8)
+    padded[: len(moves)] = moves
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)).astype(np.uint8).tobytes()
+
+
+def unpack_moves(packed: np.ndarray, n_moves: int) -> np.ndarray:
+    return ((packed[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3).reshape(-1)[:n_moves]
+
+
+def write_record(f: BinaryIO, width: int, height: int, seed: int, n_moves: int, packed: bytes) -> None:
+    f.write(RECORD_HEADER.pack(RECORD_MAGIC, width, height, seed, n_moves))
+    f.write(packed)
+
+
+class ReplayRecorder(Observer):
+    """
+    Records every move of a solution and, given a path, appends the game to that replay file when it ends.
+    The game must be seeded, a replay re-simulates food placement from the seed.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.moves: List[int] = []
+
+    def on_start(self, solution: BaseSolution) -> None:
+        if solution.game.seed is None:
+            raise ValueError("Only seeded games can be recorded")
+        self.moves = []
+
+    def on_step(self, solution: BaseSolution, direction: Direction) -> None:
+        self.moves.append(direction.value)
+
+    def on_end(self, solution: BaseSolution) -> None:
+        if self.path is None:
+            return
+        game = solution.game
+        with open(self.path, "ab") as f:
+            write_record(f, game.width, game.height, game.seed, len(self.moves), pack_moves(self.moves))  # type: ignore
+
+
+class Replay:
+    def __init__(self, width: int, height: int, seed: int, n_moves: int, packed: np.ndarray):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.n_moves = n_moves
+        # PACKED MOVES, COPIED OUT OF THE ARCHIVE SO A REPLAY OUTLIVES IT
+        self.packed = packed
+
+    @property
+    def moves(self) -> np.ndarray:
+        return unpack_moves(self.packed, self.n_moves)
+
+
+class ReplayArchive:
+    """
+    Memory maps a replay file and indexes its records by reading headers only, so a large archive can be
+    scanned without loading the moves. Only the moves of the replays taken from it are copied out of the map.
+    An empty file is an empty archive.
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, "rb")
+        # mmap CANNOT MAP AN EMPTY FILE
+        self.mmap: Optional[mmap.mmap] = None
+        if os.fstat(self.file.fileno()).st_size > 0:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.data = self.mmap if self.mmap is not None else b""
+        self.buffer = np.frombuffer(self.data, dtype=np.uint8)
+        self.offsets = self._index()
+
+    def _index(self) -> List[int]:
+        offsets = []
+        offset = 0
+        while offset < len(self.data):
+            if offset + RECORD_HEADER.size > len(self.data):
+                raise ValueError(f"Truncated replay record header at byte {offset}")
+            magic, _, _, _, n_moves = RECORD_HEADER.unpack_from(self.data, offset)
+            if magic != RECORD_MAGIC:
+                raise ValueError(f"Corrupted replay record at byte {offset}")
+            end = offset + RECORD_HEADER.size + -(-n_moves // 4)
+            if end > len(self.data):
+                raise ValueError(f"Truncated replay record at byte {offset}: {n_moves} moves do not fit in the file")
+            offsets.append(offset)
+            offset = end
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, index: int) -> Replay:
+        offset = self.offsets[index]
+        _, width, height, seed, n_moves = RECORD_HEADER.unpack_from(self.data, offset)
+        start = offset + RECORD_HEADER.size
+        return Replay(width, height, seed, n_moves, self.buffer[start : start + -(-n_moves // 4)].copy())
+
+    def __iter__(self) -> Iterator[Replay]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __enter__(self) -> "ReplayArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        # THE ONLY VIEW OF THE MAP IS buffer, DROP IT BEFORE CLOSING
+        del self.buffer
+        if self.mmap is not None:
+            self.mmap.close()
+        self.file.close()
+
+
+class Replayer:
+    """
+    Reconstructs the game state after any number of moves by re-simulation. A snapshot is kept every
+    keyframe_interval moves while simulating, so seeking costs at most keyframe_interval moves once the
+    keyframes before the target exist.
+    """
+
+    def __init__(self, replay: Replay, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.replay = replay
+        self.keyframe_interval = keyframe_interval
+        self.moves = replay.moves.tolist()
+        self.keyframes: List[SnakeGame] = [SnakeGame(replay.width, replay.height, seed=replay.seed)]
+
+    def seek(self, n_moves: int) -> SnakeGame:
+        # RETURNS A NEW GAME AFTER n_moves MOVES, KEYFRAMES ARE NEVER HANDED OUT
+        if not 0 <= n_moves <= self.replay.n_moves:
+            raise IndexError(f"Move {n_moves} is outside of the replay (0 to {self.replay.n_moves})")
+
+        keyframe_index = min(n_moves // self.keyframe_interval, len(self.keyframes) - 1)
+        game = copy.deepcopy(self.keyframes[keyframe_index])
+        for move in range(keyframe_index * self.keyframe_interval, n_moves):
+            game.make_move(Direction(self.moves[move]))
+            if (move + 1) % self.keyframe_interval == 0 and (move + 1) // self.keyframe_interval == len(self.keyframes):
+                self.keyframes.append(copy.deepcopy(game))
+        return game
+
+    def final_state(self) -> SnakeGame:
+        return self.seek(self.replay.n_moves)
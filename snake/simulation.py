@@ -0,0 +1,110 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Type
+
+from snake.game import SnakeGame
+from snake.replay import ReplayRecorder, pack_moves
+from snake.solutions.base import BaseSolution
+
+Job = Tuple[Type[BaseSolution], int, Dict[str, Any], Tuple[int, int], int, bool]
+
+
+class GameResult(NamedTuple):
+    params_index: int
+    seed: int
+    score: int
+    move_count: int
+    wall_time: float
+    perfect: bool
+    # MOVES PACKED 2 BITS EACH (SEE snake.replay), ONLY FILLED WHEN RECORDING
+    moves: bytes = b""
+
+
+def expand_grid(base_params: Dict[str, Any], grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """
+    Cartesian product of the grid values layered on top of base_params, e.g.
+    expand_grid({"room_left": 0}, {"length_cutoff": [0.5, 0.6]}) gives two parameter dicts.
+    """
+    keys = list(grid.keys())
+    params_list = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        params = dict(base_params)
+        params.update(zip(keys, values))
+        params_list.append(params)
+    return params_list
+
+
+def run_game(
+    solution_class: Type[BaseSolution],
+    params: Dict[str, Any],
+    size: Tuple[int, int],
+    seed: int,
+    params_index: int = 0,
+    record: bool = False,
+) -> GameResult:
+    # EVERY GAME OWNS ITS RNG, SO THE RESULT ONLY DEPENDS ON THE SEED AND NOT ON WHICH WORKER RAN IT OR WHEN
+    game = SnakeGame(size[0], size[1], seed=seed)
+    solution = solution_class(game=game, to_print=False, frame_period=0, **params)
+    recorder = ReplayRecorder()
+    if record:
+        solution.subscribe(recorder)
+
+    start = time.perf_counter()
+    game = solution.run()
+    wall_time = time.perf_counter() - start
+
+    return GameResult(
+        params_index=params_index,
+        seed=seed,
+        score=game.length,
+        move_count=game.move_count,
+        wall_time=wall_time,
+        perfect=game.length == game.max_length,
+        moves=pack_moves(recorder.moves) if record else b"",
+    )
+
+
+def _run_chunk(jobs: List[Job]) -> List[GameResult]:
+    return [
+        run_game(solution_class, params, size, seed, params_index, record)
+        for solution_class, params_index, params, size, seed, record in jobs
+    ]
+
+
+def run_batch(
+    solution_class: Type[BaseSolution],
+    params_list: List[Dict[str, Any]],
+    size: Tuple[int, int],
+    seeds: Iterable[int],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    record: bool = False,
+) -> Iterator[GameResult]:
+    """
+    Plays every parameter set against every seed and yields results as soon as their chunk completes,
+    so the order of the stream depends on scheduling but each result does not.
+    With record, every result also carries its packed moves for snake.replay.
+    """
+    seeds = list(seeds)
+    jobs: List[Job] = [
+        (solution_class, params_index, params, size, seed, record)
+        for params_index, params in enumerate(params_list)
+        for seed in seeds
+    ]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for job in jobs:
+            yield _run_chunk([job])[0]
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+    chunks = [jobs[i : i + chunksize] for i in range(0, len(jobs), chunksize)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
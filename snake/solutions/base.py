@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
+from typing import List, Optional
 
-from snake.game import SnakeGame
+from snake.game import Direction, SnakeGame
+from snake.profiling import PhaseTimer
+from snake.solutions.observers import ConsoleObserver, Observer
 
 
 class BaseSolution(ABC):
@@ -8,7 +11,48 @@ class BaseSolution(ABC):
         self.game = game
         self.to_print = to_print
         self.frame_period = frame_period
+        # SET BY snake.profiling.instrument, None MEANS NO TIMING
+        self.timer: Optional[PhaseTimer] = None
+
+        self.observers: List[Observer] = []
+        if to_print:
+            self.subscribe(ConsoleObserver(frame_period))
+
+    def subscribe(self, observer: Observer) -> None:
+        self.observers.append(observer)
+
+    def notify(self, message: str) -> None:
+        for observer in self.observers:
+            observer.on_message(self, message)
+
+    def start(self) -> None:
+        # CALLED ONCE BEFORE THE FIRST MOVE, OVERRIDE TO RESET PER GAME STATE
+        ...
 
     @abstractmethod
-    def run(self) -> SnakeGame:
+    def next_direction(self, game: SnakeGame) -> Direction:
+        # THE POLICY: DECIDE THE NEXT MOVE FROM THE GAME STATE, WITHOUT ANY OUTPUT
         ...
+
+    def run(self) -> SnakeGame:
+        self.start()
+        game = self.game
+
+        # HEADLESS LOOP, NOTHING BUT DECIDE AND MOVE
+        if not self.observers:
+            while not game.make_move(self.next_direction(game)):
+                pass
+            return game
+
+        for observer in self.observers:
+            observer.on_start(self)
+        while True:
+            direction = self.next_direction(game)
+            for observer in self.observers:
+                observer.on_step(self, direction)
+            if game.make_move(direction):
+                break
+        for observer in self.observers:
+            observer.on_end(self)
+
+        return game
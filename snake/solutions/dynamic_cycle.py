@@ -0,0 +1,161 @@
+from typing import Optional, Tuple
+
+import numpy as np
+
+from snake.algorithms.hamiltonian import get_hamiltonian_cycle
+from snake.game import Direction, SnakeGame
+from snake.solutions.base import BaseSolution
+
+# (dx, dy) OF EVERY Direction, INDEXED BY ITS VALUE
+STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+
+class DynamicCycleSolution(BaseSolution):
+    """
+    Follows a Hamiltonian cycle that is rewired around every new food.
+
+    Two cycle edges a -> b and c -> d on opposite sides of a 2x2 block, running in opposite directions, can be
+    swapped for a -> d and c -> b. On one cycle that splits off the loop b ... c, on two loops it merges them.
+    Planning splits a loop off the stretch between the head and the food and merges it back into the stretch
+    between the food and the tail, so the food comes earlier by the length of the loop, longest loops first.
+    Only edges between the head and the tail are rewired, so the body stays one unbroken stretch of the cycle and
+    following the cycle stays as safe as with a static one.
+
+    The cycle is kept as cells, the cell ids in cycle order, and positions, its inverse. A split and merge pair
+    moves one block of cells, and candidate blocks are found for the whole board at once with numpy.
+    """
+
+    def __init__(
+        self,
+        game: SnakeGame,
+        to_print: bool,
+        frame_period: float,
+        cycle_layout: str = "zigzag",
+        cycle_seed: int = 0,
+    ):
+        super().__init__(game, to_print, frame_period)
+        self.hc = get_hamiltonian_cycle((game.width, game.height), cycle_layout, cycle_seed)
+        if not self.hc.closed:
+            raise ValueError(f"DynamicCycleSolution needs a closed cycle, a {game.width}x{game.height} board has none")
+
+        self.width = game.width
+        self.n_cells = game.width * game.height
+        self.block_c, self.block_d = self._init_blocks(game.width, game.height)
+        self.positions = np.empty(self.n_cells, dtype=int)
+        self.food: Optional[Tuple[int, int]] = None
+        # READY TO USE AS A POLICY WITHOUT run(), WHICH CALLS start() AGAIN
+        self.start()
+
+    @staticmethod
+    def _init_blocks(width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        block_c[a, direction, side] and block_d[...] are the cells c and d that close a 2x2 block with the edge
+        from a in direction, c next to the edge's end and d next to a, or -1 off the board.
+        """
+        block_c = np.full((width * height, 4, 2), -1, dtype=int)
+        block_d = np.full((width * height, 4, 2), -1, dtype=int)
+        for a in range(width * height):
+            a_y, a_x = divmod(a, width)
+            for direction, (step_x, step_y) in enumerate(STEPS):
+                b_x, b_y = a_x + step_x, a_y + step_y
+                for side, (side_x, side_y) in enumerate(((step_y, step_x), (-step_y, -step_x))):
+                    c_x, c_y, d_x, d_y = b_x + side_x, b_y + side_y, a_x + side_x, a_y + side_y
+                    if 0 <= b_x < width and 0 <= b_y < height and 0 <= c_x < width and 0 <= c_y < height:
+                        block_c[a, direction, side] = c_y * width + c_x
+                        block_d[a, direction, side] = d_y * width + d_x
+        return block_c, block_d
+
+    def start(self) -> None:
+        self.cells = self.hc.cycle_cells.copy()
+        self.positions[self.cells] = np.arange(self.n_cells)
+        self.food = None
+        self.splices = 0
+
+    def swappable_pairs(self) -> Tuple[np.ndarray, np.ndarray]:
+        # ALL (a, c) WHOSE EDGES CLOSE A 2x2 BLOCK IN OPPOSITE DIRECTIONS, EACH PAIR APPEARS BOTH WAYS
+        width, n_cells = self.width, self.n_cells
+        successors = np.empty(n_cells, dtype=int)
+        successors[self.cells] = np.roll(self.cells, -1)
+        step = successors - np.arange(n_cells)
+        direction = np.where(step == -width, 0, np.where(step == 1, 1, np.where(step == width, 2, 3)))
+
+        c = self.block_c[np.arange(n_cells), direction]
+        d = self.block_d[np.arange(n_cells), direction]
+        valid = (c >= 0) & (successors[np.maximum(c, 0)] == d)
+        a = np.broadcast_to(np.arange(n_cells)[:, None], c.shape)
+        return a[valid], c[valid]
+
+    def splice_once(self, head: int, food: int, tail_position: int) -> bool:
+        """
+        Moves the longest loop that can be split off before the food and merged back after it.
+        Positions are distances from the head along the cycle. Returns whether the cycle changed.
+        """
+        n_cells = self.n_cells
+        relative = (self.positions - self.positions[head]) % n_cells
+        food_position = relative[food]
+        a, c = self.swappable_pairs()
+        a_position, c_position = relative[a], relative[c]
+
+        # MERGES: EDGES u BEFORE THE FOOD THAT CAN SWAP WITH AN EDGE x BETWEEN THE FOOD AND THE TAIL
+        is_merge = (c_position < food_position) & (food_position <= a_position) & (a_position < tail_position)
+        if not is_merge.any():
+            return False
+        merge_order = np.argsort(c_position[is_merge])
+        merge_x = a[is_merge][merge_order]
+        merge_positions = c_position[is_merge][merge_order]
+
+        # SPLITS: EDGES a AND c BEFORE THE FOOD, THE LOOP HOLDS THE CELLS AFTER a UP TO c. IT NEEDS A MERGE EDGE
+        # STRICTLY INSIDE, c ITSELF IS EXCLUDED BECAUSE THE SPLIT CHANGES ITS SUCCESSOR
+        is_split = (a_position < c_position) & (c_position < food_position)
+        split_a, split_c = a_position[is_split], c_position[is_split]
+        first_merge = np.searchsorted(merge_positions, split_a, side="right")
+        has_merge = first_merge < np.searchsorted(merge_positions, split_c, side="left")
+        if not has_merge.any():
+            return False
+        best = np.flatnonzero(has_merge)[np.argmax((split_c - split_a)[has_merge])]
+        start, end = int(split_a[best]), int(split_c[best])
+        merge = int(first_merge[best])
+        u_position = int(merge_positions[merge])
+        x_position = int(relative[merge_x[merge]])
+
+        # IN HEAD RELATIVE ORDER, THE LOOP start + 1 ... end GOES RIGHT AFTER x, ENTERED AT u'S SUCCESSOR
+        order = np.roll(self.cells, -int(self.positions[head]))
+        loop = order[start + 1 : end + 1]
+        split_at = u_position - start
+        self.cells = np.concatenate(
+            (
+                order[: start + 1],
+                order[end + 1 : x_position + 1],
+                loop[split_at:],
+                loop[:split_at],
+                order[x_position + 1 :],
+            )
+        )
+        self.positions[self.cells] = np.arange(n_cells)
+        self.splices += 1
+        return True
+
+    def plan(self, game: SnakeGame) -> None:
+        width = self.width
+        head_x, head_y = game.snake.head.get_position()
+        tail_x, tail_y = game.snake.tail.get_position()
+        food_x, food_y = game.food_pos
+        head, tail, food = head_y * width + head_x, tail_y * width + tail_x, food_y * width + food_x
+
+        while True:
+            # THE BODY IS THE STRETCH FROM THE TAIL BACK TO THE HEAD, A LENGTH 1 SNAKE LEAVES THE WHOLE CYCLE FREE
+            tail_position = self.n_cells
+            if game.length > 1:
+                tail_position = (self.positions[tail] - self.positions[head]) % self.n_cells
+            if not self.splice_once(head, food, tail_position):
+                break
+
+    def next_direction(self, game: SnakeGame) -> Direction:
+        if game.food_pos != self.food:
+            self.food = game.food_pos
+            self.plan(game)
+
+        head_x, head_y = game.snake.head.get_position()
+        head = head_y * self.width + head_x
+        next_y, next_x = divmod(int(self.cells[(self.positions[head] + 1) % self.n_cells]), self.width)
+        return Direction(STEPS.index((next_x - head_x, next_y - head_y)))
@@ -1,7 +1,7 @@
-import time
-from typing import Tuple
+from typing import Callable, Optional, Tuple
 
-from snake.algorithms.hamiltonian import HamiltonianCycle
+from snake.algorithms.hamiltonian import HamiltonianCycle, get_hamiltonian_cycle
+from snake.algorithms.reachability import get_reachability_check
 from snake.game import Direction, SnakeGame
 from snake.solutions.base import BaseSolution
 
@@ -76,85 +76,74 @@ class GreedySolution(BaseSolution):
         room_left: int,
         shortcut_gain_cutoff: int,
         length_cutoff: float,
+        cycle_layout: str = "zigzag",
+        cycle_seed: int = 0,
+        reachability_check: Optional[str] = None,
     ):
         self.room_left = room_left
         self.shortcut_gain_cutoff = shortcut_gain_cutoff
         self.length_cutoff = length_cutoff
+        # PAST length_cutoff, SHORTCUTS THAT PASS THIS CHECK ARE STILL TAKEN. None SKIPS THEM ALL
+        self.reachability: Optional[Callable[[SnakeGame, Direction], bool]] = None
+        if reachability_check is not None:
+            self.reachability = get_reachability_check(reachability_check, game.width, game.height)
 
         super().__init__(game, to_print, frame_period)
+        self.hc = get_hamiltonian_cycle((game.width, game.height), cycle_layout, cycle_seed)
+        if not self.hc.closed:
+            raise ValueError(f"GreedySolution needs a closed cycle, a {game.width}x{game.height} board has none")
+
+    def next_direction(self, game: SnakeGame) -> Direction:
+        hc = self.hc
+
+        # INITIALIZE VARS
+        # THE DEFAULT IS ONLY RETURNED WHEN NO MOVE IS VALID, THE GAME IS LOST EITHER WAY
+        direction = Direction.UP
+        potential_directions = [Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT]
+        valid_mask = game.valid_actions()
+        valid_directions = [direction for direction in potential_directions if valid_mask >> direction.value & 1]
+        head_pos, tail_pos = game.snake.head.get_position(), game.snake.tail.get_position()
+        food_pos = game.food_pos
+
+        # GET POTENTIAL SHORTCUTS
+        shortcut_direction_gains = []
+        for direction in valid_directions:
+            position = game.potential_position(direction)
+            shortcut_gained = get_shortcut_gained(position, food_pos, head_pos, tail_pos, hc)
+            if shortcut_gained > self.shortcut_gain_cutoff:
+                shortcut_direction_gains.append((direction, shortcut_gained))
+        shortcut_directions = [d[0] for d in sorted(shortcut_direction_gains, key=lambda x: x[1], reverse=True)]
+
+        # MOVE TO SHORTCUT OR IF NONE, MOVE NORMALLY THROUGH HAMILTONIAN CYCLE
+        past_cutoff = game.length > game.max_length * self.length_cutoff
+        for direction in shortcut_directions:
+            if past_cutoff and self.reachability is None:
+                continue
+
+            # CHECK FOR VALID ORDERING WHEN LENGTH >= 2 (POSSIBLE TO GET STUCK)
+            if game.length >= 2:
+                # CHECK IF POSITION HAS HAMILTONIAN CYCLE ORDERING
+                position = game.potential_position(direction)
+                if not is_valid_order(
+                    position,
+                    head_pos,
+                    tail_pos,
+                    hc,
+                    self.room_left,
+                ):
+                    continue
 
-    def run(self) -> SnakeGame:
-        hc = HamiltonianCycle((self.game.width, self.game.height))
-
-        while True:
-            # if self.to_print:
-            #     os.system("clear")
-
-            # INITIALIZE VARS
-            potential_directions = [Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT]
-            valid_directions = [direction for direction in potential_directions if self.game.check_valid(direction)]
-            head_pos, tail_pos = self.game.snake.head.get_position(), self.game.snake.tail.get_position()
-            food_pos = self.game.food_pos
+            if past_cutoff and self.reachability is not None and not self.reachability(game, direction):
+                continue
 
-            # GET POTENTIAL SHORTCUTS
-            shortcut_direction_gains = []
+            # DIRECTION FOUND
+            break
+        else:
+            # NO GOOD SHORTCUT, MOVE NORMALLY THROUGH HAMILTONIAN CYCLE
+            next_pos = hc.get_next_position(head_pos)
             for direction in valid_directions:
-                position = self.game.potential_position(direction)
-                shortcut_gained = get_shortcut_gained(position, food_pos, head_pos, tail_pos, hc)
-                if shortcut_gained > self.shortcut_gain_cutoff:
-                    shortcut_direction_gains.append((direction, shortcut_gained))
-            shortcut_directions = [d[0] for d in sorted(shortcut_direction_gains, key=lambda x: x[1], reverse=True)]
-
-            # MOVE TO SHORTCUT OR IF NONE, MOVE NORMALLY THROUGH HAMILTONIAN CYCLE
-            for direction in shortcut_directions:
-                if self.game.length > self.game.max_length * self.length_cutoff:
-                    continue
+                if game.potential_position(direction) == next_pos:
+                    # DIRECTION FOUND
+                    break
 
-                # CHECK FOR VALID ORDERING WHEN LENGTH >= 2 (POSSIBLE TO GET STUCK)
-                if self.game.length >= 2:
-                    # CHECK IF POSITION HAS HAMILTONIAN CYCLE ORDERING
-                    position = self.game.potential_position(direction)
-                    if not is_valid_order(
-                        position,
-                        head_pos,
-                        tail_pos,
-                        hc,
-                        self.room_left,
-                    ):
-                        continue
-
-                # DIRECTION FOUND
-                break
-            else:
-                # NO GOOD SHORTCUT, MOVE NORMALLY THROUGH HAMILTONIAN CYCLE
-                head_pos = self.game.snake.head.get_position()
-                head_order = hc.get_position_order(head_pos)
-                next_pos = hc.cycle[(head_order + 1) % len(hc.cycle)]
-                for direction in valid_directions:
-                    if self.game.potential_position(direction) == next_pos:
-                        # DIRECTION FOUND
-                        break
-
-            # DISPLAY STUFFS
-            if self.to_print:
-                hc.visualize_cycle()
-
-                print(self.game.board)
-                print("\n\n\n")
-
-                print("HEAD", (head_pos[1], head_pos[0]), hc.get_position_order(head_pos))
-                print("TAIL", (tail_pos[1], tail_pos[0]), hc.get_position_order(tail_pos))
-                print("FOOD", (food_pos[1], food_pos[0]), hc.get_position_order(food_pos))
-
-                self.game.display()
-                print(f"ACITON: {direction}")
-
-                time.sleep(self.frame_period)
-                print("\n\n\n-------\n\n\n")
-
-            if self.game.make_move(direction):
-                # print(self.game.length, self.game.move_count)
-                # self.game.display()
-                break
-
-        return self.game
+        return direction
@@ -0,0 +1,148 @@
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+from snake.algorithms.hamiltonian import get_hamiltonian_cycle
+from snake.game import Direction, SnakeGame
+from snake.solutions.base import BaseSolution
+
+ROLLOUTS = ("random", "cycle")
+DIRECTIONS = tuple(Direction)
+
+
+class SearchNode:
+    # STATISTICS OF THE MOVE SEQUENCE FROM THE ROOT TO THIS NODE, OVER EVERY FOOD SPAWN SEEN WHILE PLAYING IT
+    def __init__(self, valid_mask: int):
+        self.untried: List[Direction] = [direction for direction in DIRECTIONS if valid_mask >> direction.value & 1]
+        self.children: Dict[Direction, SearchNode] = {}
+        self.visits = 0
+        self.total = 0.0
+
+    def select(self, exploration: float) -> Direction:
+        # UCT: MEAN REWARD PLUS AN EXPLORATION BONUS THAT SHRINKS AS A CHILD IS VISITED
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda direction: self.children[direction].total / self.children[direction].visits
+            + exploration * math.sqrt(log_visits / self.children[direction].visits),
+        )
+
+
+class MCTSSolution(BaseSolution):
+    """
+    Monte Carlo tree search on a separate search game: every iteration restores a snapshot of the live game into it,
+    walks the tree with UCT, adds one move and plays a rollout of at most rollout_depth moves.
+    A rollout scores 0 if the snake dies, 1 if it fills the board and otherwise between 0.5 and 1 by food eaten.
+    The most visited move is played once time_budget_ms has passed or after max_iterations iterations.
+    With a time budget that is never reached, max_iterations alone decides and games are reproducible.
+
+    The live game is only read, so it sees a single make_move per tick. Food eaten during the search spawns from the
+    solution's RNG, so the search does not see the game's future food.
+    Rollouts follow the Hamiltonian cycle when its next move is valid and play a random valid move otherwise
+    ("cycle"), or only play random valid moves ("random"), which dies far more often on long snakes.
+    """
+
+    def __init__(
+        self,
+        game: SnakeGame,
+        to_print: bool,
+        frame_period: float,
+        time_budget_ms: float = 5.0,
+        max_iterations: Optional[int] = None,
+        rollout: str = "cycle",
+        rollout_depth: int = 20,
+        exploration: float = 1.4,
+        seed: Optional[int] = None,
+        cycle_layout: str = "zigzag",
+        cycle_seed: int = 0,
+    ):
+        if rollout not in ROLLOUTS:
+            raise ValueError(f"Unknown rollout {rollout!r}, expected one of {ROLLOUTS}")
+        self.time_budget_ms = time_budget_ms
+        self.max_iterations = max_iterations
+        self.rollout = rollout
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        # SAME SEEDING AS RandomSolution: A STREAM DERIVED FROM THE GAME SEED UNLESS ONE IS GIVEN
+        if seed is None and game.seed is not None:
+            self.random = random.Random(f"solution-{game.seed}")
+        else:
+            self.random = random.Random(seed)
+
+        super().__init__(game, to_print, frame_period)
+        self.hc = get_hamiltonian_cycle((game.width, game.height), cycle_layout, cycle_seed)
+        self.iterations = 0
+        self.search_game = SnakeGame(game.width, game.height)
+        self.search_game.random = self.random
+
+    def next_direction(self, game: SnakeGame) -> Direction:
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        root = SearchNode(game.valid_actions())
+        if not root.untried:
+            # NO VALID MOVE, THE GAME IS LOST EITHER WAY
+            return Direction.UP
+
+        state = game.snapshot()
+        search = self.search_game
+        iterations = 0
+        while iterations == 0 or (
+            time.perf_counter() < deadline and (self.max_iterations is None or iterations < self.max_iterations)
+        ):
+            # THE SEARCH GAME KEEPS DRAWING FROM THE SOLUTION'S RNG
+            search.restore(state, restore_random=False)
+            self.iterate(search, root)
+            iterations += 1
+
+        self.iterations += iterations
+        return max(root.children, key=lambda direction: root.children[direction].visits)
+
+    def iterate(self, game: SnakeGame, root: SearchNode) -> None:
+        node = root
+        path = [root]
+        start_length = game.length
+        over = False
+
+        # SELECT: FOLLOW UCT WHILE EVERY MOVE OF THE NODE HAS BEEN TRIED
+        while not over and not node.untried and node.children:
+            direction = node.select(self.exploration)
+            node = node.children[direction]
+            path.append(node)
+            over = game.make_move(direction)
+
+        # EXPAND: ONE NEW MOVE
+        if not over and node.untried:
+            direction = node.untried.pop(self.random.randrange(len(node.untried)))
+            over = game.make_move(direction)
+            child = SearchNode(0 if over else game.valid_actions())
+            node.children[direction] = child
+            node = child
+            path.append(node)
+
+        reward = self.play_rollout(game, over, start_length)
+        for node in path:
+            node.visits += 1
+            node.total += reward
+
+    def play_rollout(self, game: SnakeGame, over: bool, start_length: int) -> float:
+        depth = 0
+        while not over and depth < self.rollout_depth:
+            valid_mask = game.valid_actions()
+            if not valid_mask:
+                return 0.0
+            over = game.make_move(self.rollout_direction(game, valid_mask))
+            depth += 1
+
+        if over:
+            # A MOVE THAT ENDS THE GAME EITHER FILLS THE BOARD OR KILLS THE SNAKE
+            return 1.0 if game.length == game.max_length else 0.0
+        eaten = game.length - start_length
+        return 0.5 + 0.5 * eaten / (eaten + 1)
+
+    def rollout_direction(self, game: SnakeGame, valid_mask: int) -> Direction:
+        if self.rollout == "cycle":
+            head_x, head_y = game.snake.head.get_position()
+            direction = int(self.hc.next_direction[head_y, head_x])
+            if direction != -1 and valid_mask >> direction & 1:
+                return DIRECTIONS[direction]
+        return self.random.choice([direction for direction in DIRECTIONS if valid_mask >> direction.value & 1])
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING
+
+from snake.game import Direction
+from snake.render import TerminalRenderer
+
+if TYPE_CHECKING:
+    from snake.solutions.base import BaseSolution
+
+
+class Observer:
+    """
+    Receives the events of a running solution. Every hook is a no-op, subclasses override what they need.
+    A solution without observers runs a loop that never calls any of them.
+    """
+
+    def on_start(self, solution: BaseSolution) -> None:
+        ...
+
+    def on_step(self, solution: BaseSolution, direction: Direction) -> None:
+        # CALLED AFTER THE DIRECTION IS DECIDED AND BEFORE IT IS APPLIED
+        ...
+
+    def on_message(self, solution: BaseSolution, message: str) -> None:
+        ...
+
+    def on_end(self, solution: BaseSolution) -> None:
+        ...
+
+
+class ConsoleObserver(Observer):
+    # THE PRINTED OUTPUT OF to_print=True
+    def __init__(self, frame_period: float):
+        self.frame_period = frame_period
+
+    def on_step(self, solution: BaseSolution, direction: Direction) -> None:
+        game = solution.game
+        hc = getattr(solution, "hc", None)
+        head_pos, tail_pos = game.snake.head.get_position(), game.snake.tail.get_position()
+        food_pos = game.food_pos
+
+        if hc is not None:
+            hc.visualize_cycle()
+
+        print(game.board)
+        print("\n\n\n")
+
+        if hc is not None:
+            print("HEAD", (head_pos[1], head_pos[0]), hc.get_position_order(head_pos))
+            print("TAIL", (tail_pos[1], tail_pos[0]), hc.get_position_order(tail_pos))
+            print("FOOD", (food_pos[1], food_pos[0]), hc.get_position_order(food_pos))
+
+        game.display()
+        print(f"ACITON: {direction}")
+
+        time.sleep(self.frame_period)
+        print("\n\n\n-------\n\n\n")
+
+    def on_message(self, solution: BaseSolution, message: str) -> None:
+        print(message)
+
+
+class RenderObserver(Observer):
+    # DRAWS THROUGH A TerminalRenderer, step_period SLOWS THE GAME DOWN FOR WATCHING INDEPENDENTLY OF THE FRAME RATE
+    def __init__(self, renderer: TerminalRenderer, step_period: float = 0.0):
+        self.renderer = renderer
+        self.step_period = step_period
+
+    def on_start(self, solution: BaseSolution) -> None:
+        self.renderer.render(solution.game, force=True)
+
+    def on_step(self, solution: BaseSolution, direction: Direction) -> None:
+        self.renderer.render(solution.game)
+        if self.step_period:
+            time.sleep(self.step_period)
+
+    def on_end(self, solution: BaseSolution) -> None:
+        self.renderer.render(solution.game, force=True)
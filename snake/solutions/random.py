@@ -1,13 +1,10 @@
 import random
-import time
-from typing import Tuple
+from typing import Optional, Tuple
 
-from snake.algorithms.hamiltonian import HamiltonianCycle
+from snake.algorithms.hamiltonian import HamiltonianCycle, get_hamiltonian_cycle
 from snake.game import Direction, SnakeGame
 from snake.solutions.base import BaseSolution
 
-random.seed(10)
-
 
 def not_overtake_tail(
     pos: Tuple[int, int], head: Tuple[int, int], tail: Tuple[int, int], hc: HamiltonianCycle, room_left: int
@@ -88,73 +85,75 @@ def not_overtake_food(
 
 
 class RandomSolution(BaseSolution):
-    def __init__(self, game: SnakeGame, to_print: bool, frame_period: float, room_left: int, length_cutoff: float):
+    def __init__(
+        self,
+        game: SnakeGame,
+        to_print: bool,
+        frame_period: float,
+        room_left: int,
+        length_cutoff: float,
+        seed: Optional[int] = None,
+        cycle_layout: str = "zigzag",
+        cycle_seed: int = 0,
+    ):
         self.room_left = room_left
         self.length_cutoff = length_cutoff
+        # WITHOUT AN EXPLICIT SEED, DERIVE A SEPARATE STREAM FROM THE GAME SEED SO THE WHOLE GAME IS REPRODUCIBLE
+        # FROM IT, WHILE THE GAME'S OWN RNG ONLY DRIVES FOOD (REPLAYS RE-SIMULATE FOOD FROM THE MOVES ALONE)
+        if seed is None and game.seed is not None:
+            self.random = random.Random(f"solution-{game.seed}")
+        else:
+            self.random = random.Random(seed)
 
         super().__init__(game, to_print, frame_period)
-
-    def run(self) -> SnakeGame:
-        hc = HamiltonianCycle((self.game.width, self.game.height))
-
-        while True:
-            # MOVE SNAKE HEAD TO NEXT RANDOM POSITION
-            potential_directions = [Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT]
-            random.shuffle(potential_directions)
-
-            valid_directions = [direction for direction in potential_directions if self.game.check_valid(direction)]
-            head_pos = self.game.snake.head.get_position()
-            tail_pos = self.game.snake.tail.get_position()
-            food_pos = self.game.food_pos
-
-            for direction in valid_directions:
-                if self.game.length > self.game.max_length * self.length_cutoff:
+        self.hc = get_hamiltonian_cycle((game.width, game.height), cycle_layout, cycle_seed)
+        if not self.hc.closed:
+            raise ValueError(f"RandomSolution needs a closed cycle, a {game.width}x{game.height} board has none")
+
+    def next_direction(self, game: SnakeGame) -> Direction:
+        hc = self.hc
+
+        # MOVE SNAKE HEAD TO NEXT RANDOM POSITION
+        # THE DEFAULT IS ONLY RETURNED WHEN NO MOVE IS VALID, THE GAME IS LOST EITHER WAY
+        direction = Direction.UP
+        potential_directions = [Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT]
+        self.random.shuffle(potential_directions)
+
+        valid_mask = game.valid_actions()
+        valid_directions = [direction for direction in potential_directions if valid_mask >> direction.value & 1]
+        head_pos = game.snake.head.get_position()
+        tail_pos = game.snake.tail.get_position()
+        food_pos = game.food_pos
+
+        for direction in valid_directions:
+            if game.length > game.max_length * self.length_cutoff:
+                continue
+            # CHECK FOR VALID ORDERING WHEN LENGTH >= 2 (POSSIBLE TO GET STUCK)
+            if game.length >= 2:
+                # CHECK IF POSITION HAS HAMILTONIAN CYCLE ORDERING
+                position = game.potential_position(direction)
+                if not not_overtake_tail(
+                    position,
+                    head_pos,
+                    tail_pos,
+                    hc,
+                    self.room_left,
+                ):
                     continue
-                # CHECK FOR VALID ORDERING WHEN LENGTH >= 2 (POSSIBLE TO GET STUCK)
-                if self.game.length >= 2:
-                    # CHECK IF POSITION HAS HAMILTONIAN CYCLE ORDERING
-                    position = self.game.potential_position(direction)
-                    if not not_overtake_tail(
-                        position,
-                        head_pos,
-                        tail_pos,
-                        hc,
-                        self.room_left,
-                    ):
-                        continue
-
-                    if not positive_move(position, head_pos, hc):
-                        continue
-                    if not not_overtake_food(position, food_pos, head_pos, tail_pos, hc):
-                        continue
-
-                # DIRECTION FOUND
-                break
-            else:
-                # NO GOOD SHORTCUT OR LENGTH TOO LONG, MOVE NORMALLY THROUGH HAMILTONIAN CYCLE
-                head_order = hc.get_position_order(head_pos)
-                next_pos = hc.cycle[(head_order + 1) % len(hc.cycle)]
-                for direction in valid_directions:
-                    if self.game.potential_position(direction) == next_pos:
-                        # DIRECTION FOUND
-                        break
 
-            # DISPLAY STUFFS
-            if self.to_print:
-                hc.visualize_cycle()
-
-                print(self.game.board)
-                print("\n\n\n")
-
-                print("HEAD", (head_pos[1], head_pos[0]), hc.get_position_order(head_pos))
-                print("TAIL", (tail_pos[1], tail_pos[0]), hc.get_position_order(tail_pos))
-                print("FOOD", (food_pos[1], food_pos[0]), hc.get_position_order(food_pos))
-
-                self.game.display()
-                print(f"ACITON: {direction}")
-                time.sleep(self.frame_period)
+                if not positive_move(position, head_pos, hc):
+                    continue
+                if not not_overtake_food(position, food_pos, head_pos, tail_pos, hc):
+                    continue
 
-            if self.game.make_move(direction):
-                break
+            # DIRECTION FOUND
+            break
+        else:
+            # NO GOOD SHORTCUT OR LENGTH TOO LONG, MOVE NORMALLY THROUGH HAMILTONIAN CYCLE
+            next_pos = hc.get_next_position(head_pos)
+            for direction in valid_directions:
+                if game.potential_position(direction) == next_pos:
+                    # DIRECTION FOUND
+                    break
 
-        return self.game
+        return direction
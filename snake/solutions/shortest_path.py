@@ -1,46 +1,20 @@
-import time
-from typing import Dict, List, Tuple
+from time import perf_counter_ns
+from typing import Callable, List, Optional, Tuple
 
-from snake.algorithms.djikstra import Graph, find_shortest_path  # type: ignore
-from snake.algorithms.hamiltonian import HamiltonianCycle
+import numpy as np
+
+from snake.algorithms.grid_search import astar, bfs, dijkstra, neighbour_array
+from snake.algorithms.hamiltonian import HamiltonianCycle, get_hamiltonian_cycle
+from snake.algorithms.reachability import get_reachability_check
 from snake.game import Direction, SnakeGame
+from snake.kernels import compiled_kernels, get_backend
+from snake.profiling import PhaseTimer
 from snake.solutions.base import BaseSolution
 
 SHORTCUT_GAIN_CUTOFF = 10
 
-
-def convert_to_graph_dict(board: List[List[int]]) -> Dict[Tuple[int, int], Dict[Tuple[int, int], int]]:
-    n, m = len(board), len(board[0])
-
-    # INITIALIZE EMPTY GRAPH DICT
-    # INDEX IS SWITCHED BECAUSE WE WANT TO STORE POSITIONS INSTEAD OF BOARD INDICES
-    gd: Dict[Tuple[int, int], Dict[Tuple[int, int], int]] = {}
-    for i in range(n):
-        for j in range(m):
-            gd[(j, i)] = {}
-
-    for i in range(n):
-        for j in range(m):
-            y, x = i, j
-
-            if board[y][x] != 0:
-                continue
-
-            deltas = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-            for delta_y, delta_x in deltas:
-                new_y = y + delta_y
-                new_x = x + delta_x
-
-                if 0 <= new_y < n and 0 <= new_x < m:
-                    value = board[new_y][new_x]
-                    if value == 0:
-                        gd[(x, y)][(new_x, new_y)] = 1
-
-    # for source, dests in gd.items():
-    #     for dest, distance in dests.items():
-    #         print(source, dest, distance)
-
-    return gd
+# GRID SEARCHES THE PLANNER CAN USE, ALL TAKE THE FLAT PASSABLE MASK AND FIND A SHORTEST PATH, TIES MAY DIFFER
+SEARCHES = {"bfs": bfs, "dijkstra": dijkstra, "astar": astar}
 
 
 def is_valid_order(
@@ -73,140 +47,241 @@ def is_valid_order(
         return False
 
 
+def within_cycle_bounds(order: np.ndarray, head_order: int, tail_order: int, food_order: int) -> np.ndarray:
+    # CELLS WHOSE CYCLE ORDER NEITHER OVERTAKES THE TAIL NOR THE FOOD, FOR ANY ARRAY OF ORDERS
+    allowed = np.ones(order.shape, dtype=bool)
+
+    # CANNOT OVERTAKE TAIL
+    if head_order > tail_order:
+        allowed &= (order <= tail_order) | (order >= head_order)
+    elif head_order < tail_order:
+        allowed &= (head_order <= order) & (order <= tail_order)
+
+    # CANNOT OVERTAKE FOOD
+    if head_order < food_order:
+        allowed &= (head_order <= order) & (order <= food_order)
+    else:
+        allowed &= (order <= food_order) | (order >= head_order)
+
+    return allowed
+
+
 def prepare_graph(
-    board: List[List[int]],
+    board: np.ndarray,
     head: Tuple[int, int],
     tail: Tuple[int, int],
     food: Tuple[int, int],
     hc: HamiltonianCycle,
-) -> Graph:
-    # HEAD AND FOOD AS 0s
-    board[head[1]][head[0]] = 0
-    board[food[1]][food[0]] = 0
+) -> np.ndarray:
+    """
+    Returns a (H, W) boolean mask of the cells the shortest path may use: empty cells plus head and food,
+    minus cells that would overtake the tail or the food in Hamiltonian cycle order.
+    """
+    # HEAD AND FOOD AS EMPTY
+    passable = board == 0
+    passable[head[1], head[0]] = True
+    passable[food[1], food[0]] = True
 
-    # INVALID ORDERING AS 3s AND 4s
-    n, m = len(board), len(board[0])
     head_order, tail_order = hc.get_position_order(head), hc.get_position_order(tail)
     food_order = hc.get_position_order(food)
-
-    # CANNOT OVERTAKE TAIL
-    for i in range(n):
-        for j in range(m):
-            if board[i][j] == 0:
-                y, x = i, j
-                order = hc.get_position_order((x, y))
-                if head_order == tail_order:
-                    ...
-                elif head_order > tail_order:
-                    if tail_order < order < head_order:
-                        # print("HERE", head_order, tail_order, order)
-                        board[i][j] = 3
-                else:
-                    if not (head_order <= order <= tail_order):
-                        # print("HOHO", head_order, tail_order, order)
-                        board[i][j] = 3
-
-    # CANNOT OVERTAKE FOOD
-    for i in range(n):
-        for j in range(m):
-            if board[i][j] == 0:
-                y, x = i, j
-                order = hc.get_position_order((x, y))
-                if head_order < food_order:
-                    if order < head_order or order > food_order:
-                        board[i][j] = 4
-                else:
-                    if food_order < order < head_order:
-                        board[i][j] = 4
-
-    # print(board)
-    gd = convert_to_graph_dict(board)
-    nodes = [key for key in gd.keys()]
-    graph = Graph(nodes, gd)
-    return graph
+    passable &= within_cycle_bounds(hc.order, head_order, tail_order, food_order)
+
+    return passable
+
+
+class PathPlanner:
+    """
+    Keeps the last head -> food path between ticks. A kept path is re-checked on its own cells only, and the board
+    is searched again only when the food moved or one of those cells became forbidden.
+    The returned list is the planner's own path (head excluded), pop cells from it as the snake reaches them.
+    search names the grid search in SEARCHES. The numba backend only compiles bfs, the others always run in Python.
+    """
+
+    def __init__(self, hc: HamiltonianCycle, timer: Optional[PhaseTimer] = None, search: str = "bfs"):
+        if search not in SEARCHES:
+            raise ValueError(f"Unknown search {search!r}, expected one of {tuple(SEARCHES)}")
+        self.hc = hc
+        self.timer = timer
+        self.search = search
+        self.path: List[Tuple[int, int]] = []
+        self.food: Optional[Tuple[int, int]] = None
+        self.searches = 0
+        # SCRATCH ARRAYS OF THE numba BACKEND
+        n_cells = hc.size[0] * hc.size[1]
+        self.passable = np.zeros(n_cells, dtype=bool)
+        self.parents = np.zeros(n_cells, dtype=np.int64)
+        self.queue = np.zeros(n_cells, dtype=np.int64)
+
+    def reset(self) -> None:
+        # FORGET THE KEPT PATH FOR A NEW GAME, THE SCRATCH ARRAYS ARE REUSED
+        self.path = []
+        self.food = None
+        self.searches = 0
+
+    def is_path_valid(self, board: np.ndarray, head: Tuple[int, int], tail: Tuple[int, int]) -> bool:
+        if not self.path or self.food is None:
+            return False
+        next_x, next_y = self.path[0]
+        if abs(next_x - head[0]) + abs(next_y - head[1]) != 1:
+            return False
+
+        xs = np.array([x for x, _ in self.path])
+        ys = np.array([y for _, y in self.path])
+        free = board[ys, xs] == 0
+        free[-1] = True
+        hc = self.hc
+        allowed = within_cycle_bounds(
+            hc.order[ys, xs],
+            hc.get_position_order(head),
+            hc.get_position_order(tail),
+            hc.get_position_order(self.food),
+        )
+        return bool((free & allowed).all())
+
+    def plan(
+        self, board: np.ndarray, head: Tuple[int, int], tail: Tuple[int, int], food: Tuple[int, int]
+    ) -> List[Tuple[int, int]]:
+        if self.timer is None:
+            return self._plan(board, head, tail, food)
+
+        start = perf_counter_ns()
+        path = self._plan(board, head, tail, food)
+        self.timer.record("plan", perf_counter_ns() - start)
+        return path
+
+    def _plan(
+        self, board: np.ndarray, head: Tuple[int, int], tail: Tuple[int, int], food: Tuple[int, int]
+    ) -> List[Tuple[int, int]]:
+        if food == self.food and self.is_path_valid(board, head, tail):
+            return self.path
+
+        self.searches += 1
+        self.food = food
+        if get_backend() == "numba" and self.search == "bfs":
+            path = self._search_compiled(board, head, tail, food)
+        else:
+            passable = prepare_graph(board, head, tail, food, self.hc)
+            # A PASSABLE CELL COSTS 1 TO ENTER AND A BLOCKED ONE 0, WHICH dijkstra AND astar READ AS A WALL
+            path = SEARCHES[self.search](passable.ravel().tolist(), board.shape[1], board.shape[0], head, food)
+        self.path = [] if path is None else path[1:]
+        return self.path
+
+    def _search_compiled(
+        self, board: np.ndarray, head: Tuple[int, int], tail: Tuple[int, int], food: Tuple[int, int]
+    ) -> Optional[List[Tuple[int, int]]]:
+        # prepare_graph AND bfs AS COMPILED KERNELS OVER THE FLAT BOARD, SAME PATH
+        kernels = compiled_kernels()
+        hc = self.hc
+        height, width = board.shape
+        head_cell, food_cell = head[1] * width + head[0], food[1] * width + food[0]
+        kernels.cycle_mask(
+            board.ravel(),
+            hc.order.ravel(),
+            head_cell,
+            food_cell,
+            hc.get_position_order(head),
+            hc.get_position_order(tail),
+            hc.get_position_order(food),
+            self.passable,
+        )
+        if not kernels.bfs_cells(
+            self.passable, neighbour_array(width, height), head_cell, food_cell, self.parents, self.queue
+        ):
+            return None
+
+        path = []
+        cell = food_cell
+        while cell != head_cell:
+            path.append(cell)
+            cell = int(self.parents[cell])
+        path.append(head_cell)
+        return [(cell % width, cell // width) for cell in reversed(path)]
 
 
 class ShortestPathSolution(BaseSolution):
-    def __init__(self, game: SnakeGame, to_print: bool, frame_period: float, length_cutoff: float):
+    def __init__(
+        self,
+        game: SnakeGame,
+        to_print: bool,
+        frame_period: float,
+        length_cutoff: float,
+        replan_every_tick: bool = False,
+        cycle_layout: str = "zigzag",
+        cycle_seed: int = 0,
+        reachability_check: Optional[str] = None,
+        search: str = "bfs",
+    ):
         self.length_cutoff = length_cutoff
+        self.replan_every_tick = replan_every_tick
+        # PAST length_cutoff, PATHS ARE STILL FOLLOWED WHILE EVERY STEP PASSES THIS CHECK. None STOPS PLANNING
+        self.reachability: Optional[Callable[[SnakeGame, Direction], bool]] = None
+        if reachability_check is not None:
+            self.reachability = get_reachability_check(reachability_check, game.width, game.height)
 
         super().__init__(game, to_print, frame_period)
+        self.hc = get_hamiltonian_cycle((game.width, game.height), cycle_layout, cycle_seed)
+        if not self.hc.closed:
+            raise ValueError(f"ShortestPathSolution needs a closed cycle, a {game.width}x{game.height} board has none")
+        self.planner = PathPlanner(self.hc, search=search)
+        self.shortest_path: List[Tuple[int, int]] = []
+
+    def start(self) -> None:
+        # THE TIMER IS ONLY SET AFTER CONSTRUCTION, BY snake.profiling.instrument
+        self.planner.timer = self.timer
+        self.planner.reset()
+        self.shortest_path = []
+
+    def next_direction(self, game: SnakeGame) -> Direction:
+        hc = self.hc
+        shortest_path = self.shortest_path
+
+        # INITIALIZE VARS
+        head_pos, tail_pos = game.snake.head.get_position(), game.snake.tail.get_position()
+        food_pos = game.food_pos
+
+        # RENEW SHORTEST PATH WHEN FOOD IS REACHED, OR CHECK AND REPAIR IT ON EVERY TICK
+        past_cutoff = game.length > game.max_length * self.length_cutoff
+        if len(shortest_path) == 0 or self.replan_every_tick:
+            if past_cutoff and self.reachability is None:
+                if len(shortest_path) == 0:
+                    self.notify("NOT ATTEMPTING TO FIND SHORTEST PATH")
+            else:
+                searches = self.planner.searches
+                shortest_path = self.shortest_path = self.planner.plan(game.board, head_pos, tail_pos, food_pos)
+                if self.planner.searches > searches:
+                    if len(shortest_path) == 0:
+                        self.notify("CANT FIND VALID SHORTEST PATH")
+                    elif self.observers:
+                        # ONLY FORMAT THE PATH WHEN SOMEONE LISTENS
+                        self.notify(f"NEW SHORTEST PATH: {shortest_path}")
+
+        potential_directions = [Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT]
+        if len(shortest_path) > 0:
+            # SHORTEST PATH IS FOUND, MOVE TO POSITIONS IN PATH
+            for direction in potential_directions:
+                if game.potential_position(direction) == shortest_path[0]:
+                    break
+            else:
+                raise ValueError("Unable to find direction to next position in shortest path")
 
-    def run(self) -> SnakeGame:
-        hc = HamiltonianCycle((self.game.width, self.game.height))
-
-        shortest_path: List[Tuple[int, int]] = []
-        while True:
-            # INITIALIZE VARS
-            head_pos, tail_pos = self.game.snake.head.get_position(), self.game.snake.tail.get_position()
-            food_pos = self.game.food_pos
-
-            # RENEW SHORTEST PATH WHEN FOOD IS REACHED
-            if len(shortest_path) == 0:
-                if self.game.length > self.game.max_length * self.length_cutoff:
-                    if self.to_print:
-                        print("NOT ATTEMPTING TO FIND SHORTEST PATH")
-                else:
-                    # PREPARE GRAPH
-                    graph = prepare_graph(self.game.board.copy(), head_pos, tail_pos, food_pos, hc)  # type: ignore
-
-                    # FIND SHORTEST PATH
-                    try:
-                        shortest_path = find_shortest_path(graph, head_pos, food_pos)
-                        print(shortest_path)
-                    except KeyError:
-                        if self.to_print:
-                            print("CANT FIND VALID SHORTEST PATH")
-                    else:
-                        shortest_path.pop(0)
-                        if self.to_print:
-                            print("NEW SHORTEST PATH:", shortest_path)
-
-            if len(shortest_path) > 0:
-                # SHORTEST PATH IS FOUND, MOVE TO POSITIONS IN PATH
-                potential_directions = [Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT]
-                for direction in potential_directions:
-                    if self.game.potential_position(direction) == shortest_path[0]:
-                        shortest_path.pop(0)
-                        break
-                else:
-                    raise ValueError("Unable to find direction to next position in shortest path")
+            if past_cutoff and self.reachability is not None and not self.reachability(game, direction):
+                # DROP THE PATH AND FOLLOW THE CYCLE, THE NEXT TICK PLANS AGAIN
+                shortest_path.clear()
             else:
-                # NO GOOD SHORTCUT, MOVE NORMALLY THROUGH HAMILTONIAN CYCLE
-                potential_directions = [Direction.UP, Direction.RIGHT, Direction.DOWN, Direction.LEFT]
-                valid_directions = [direction for direction in potential_directions if self.game.check_valid(direction)]
-
-                head_pos = self.game.snake.head.get_position()
-                head_order = hc.get_position_order(head_pos)
-                next_pos = hc.cycle[(head_order + 1) % len(hc.cycle)]
-                for direction in valid_directions:
-                    if self.game.potential_position(direction) == next_pos:
-                        # DIRECTION FOUND
-                        break
-                else:
-                    if self.to_print:
-                        print("DIR NOT FOUND")
-
-            # DISPLAY STUFFS
-            if self.to_print:
-                hc.visualize_cycle()
-
-                print(self.game.board)
-                print("\n\n\n")
-
-                print("HEAD", (head_pos[1], head_pos[0]), hc.get_position_order(head_pos))
-                print("TAIL", (tail_pos[1], tail_pos[0]), hc.get_position_order(tail_pos))
-                print("FOOD", (food_pos[1], food_pos[0]), hc.get_position_order(food_pos))
-
-                self.game.display()
-                print(f"ACITON: {direction}")
-
-                time.sleep(self.frame_period)
-                print("\n\n\n-------\n\n\n")
-
-            if self.game.make_move(direction):
-                # print(self.game.length, self.game.move_count)
-                # self.game.display()
+                shortest_path.pop(0)
+                return direction
+
+        # NO GOOD SHORTCUT, MOVE NORMALLY THROUGH HAMILTONIAN CYCLE
+        # THE DEFAULT IS ONLY RETURNED WHEN NO MOVE IS VALID, THE GAME IS LOST EITHER WAY
+        direction = Direction.UP
+        valid_mask = game.valid_actions()
+        valid_directions = [direction for direction in potential_directions if valid_mask >> direction.value & 1]
+        next_pos = hc.get_next_position(head_pos)
+        for direction in valid_directions:
+            if game.potential_position(direction) == next_pos:
+                # DIRECTION FOUND
                 break
+        else:
+            self.notify("DIR NOT FOUND")
 
-        return self.game
+        return direction
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import math
+import sys
+import time
+from typing import List, Optional, TextIO, Tuple
+
+# DEFAULT NUMBER OF MOVE COUNT BINS, QUANTILES ARE EXACT TO ONE BIN WIDTH
+MOVE_BINS = 1024
+
+
+class RunningStats:
+    """
+    Count, mean and variance of a stream in constant memory (Welford's algorithm), plus min and max.
+    Two instances fed with different parts of a stream merge into the stats of the whole stream.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: RunningStats) -> None:
+        # CHAN ET AL.'S PAIRWISE UPDATE
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        # SAMPLE VARIANCE
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class Histogram:
+    """
+    Fixed width bins over [low, high), values outside land in the first or last bin.
+    Quantiles interpolate inside a bin, so they are off by at most one bin width.
+    """
+
+    def __init__(self, low: float, high: float, bins: int):
+        self.low = low
+        self.high = high
+        self.width = (high - low) / bins
+        self.counts: List[int] = [0] * bins
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        i = int((value - self.low) / self.width)
+        self.counts[min(max(i, 0), len(self.counts) - 1)] += 1
+        self.count += 1
+
+    def merge(self, other: Histogram) -> None:
+        if (other.low, other.high, len(other.counts)) != (self.low, self.high, len(self.counts)):
+            raise ValueError("Cannot merge histograms with different bins")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return math.nan
+        target = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= target:
+                return self.low + (i + (target - seen) / count) * self.width
+            seen += count
+        return self.high
+
+
+def wilson_interval(successes: int, n: int, z: float = 1.96) -> Tuple[float, float]:
+    # CONFIDENCE INTERVAL OF A RATE, z = 1.96 FOR 95%. UNLIKE THE NORMAL APPROXIMATION IT STAYS IN [0, 1] NEAR 0 AND 1
+    if n == 0:
+        return 0.0, 1.0
+    rate = successes / n
+    denominator = 1 + z * z / n
+    center = (rate + z * z / (2 * n)) / denominator
+    half_width = z * math.sqrt(rate * (1 - rate) / n + z * z / (4 * n * n)) / denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class GameStats:
+    """
+    Constant memory summary of a stream of games on one board size: perfect game count, running stats of score,
+    move count and wall time, and move count quantiles from a histogram up to (W * H) ** 2 moves, more than
+    following the cycle to every food needs. Stats of the same size merge, e.g. the ones of different workers.
+    """
+
+    def __init__(self, size: Tuple[int, int], move_bins: int = MOVE_BINS):
+        self.size = size
+        self.games = 0
+        self.perfect = 0
+        self.scores = RunningStats()
+        self.moves = RunningStats()
+        self.wall_times = RunningStats()
+        self.move_histogram = Histogram(0, (size[0] * size[1]) ** 2, move_bins)
+
+    def add(self, score: int, move_count: int, perfect: bool, wall_time: float = 0.0) -> None:
+        self.games += 1
+        self.perfect += perfect
+        self.scores.add(score)
+        self.moves.add(move_count)
+        self.wall_times.add(wall_time)
+        self.move_histogram.add(move_count)
+
+    def merge(self, other: GameStats) -> None:
+        self.games += other.games
+        self.perfect += other.perfect
+        self.scores.merge(other.scores)
+        self.moves.merge(other.moves)
+        self.wall_times.merge(other.wall_times)
+        self.move_histogram.merge(other.move_histogram)
+
+    @property
+    def perfect_rate(self) -> float:
+        return self.perfect / self.games if self.games else 0.0
+
+    def summary(self) -> str:
+        low, high = wilson_interval(self.perfect, self.games)
+        return "\n".join(
+            [
+                "Games: {} - Average score: {:.2f} (sd {:.2f})".format(self.games, self.scores.mean, self.scores.std),
+                "Average move count: {:.1f} (sd {:.1f}) - p50 {:.0f} - p90 {:.0f} - p99 {:.0f}".format(
+                    self.moves.mean,
+                    self.moves.std,
+                    self.move_histogram.quantile(0.5),
+                    self.move_histogram.quantile(0.9),
+                    self.move_histogram.quantile(0.99),
+                ),
+                "Percentage of perfect game {:.3f} (95% CI {:.3f} - {:.3f})".format(self.perfect_rate, low, high),
+            ]
+        )
+
+
+class ProgressReporter:
+    # ONE OVERWRITTEN STATUS LINE WITH THROUGHPUT AND ETA, REDRAWN AT MOST EVERY period SECONDS
+    def __init__(self, total: int, stream: Optional[TextIO] = None, period: float = 0.5):
+        self.total = total
+        self.stream = stream if stream is not None else sys.stderr
+        self.period = period
+        self.start = time.perf_counter()
+        self.last_draw = -math.inf
+
+    def update(self, stats: GameStats) -> None:
+        now = time.perf_counter()
+        if now - self.last_draw < self.period and stats.games < self.total:
+            return
+        self.last_draw = now
+
+        elapsed = now - self.start
+        rate = stats.games / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - stats.games) / rate if rate > 0 else math.inf
+        self.stream.write(
+            "\r{}/{} games - {:.1f} games/s - ETA {:.0f}s - perfect {:.3f} - average move count {:.1f}   ".format(
+                stats.games, self.total, rate, eta, stats.perfect_rate, stats.moves.mean
+            )
+        )
+        self.stream.flush()
+
+    def finish(self) -> None:
+        self.stream.write("\n")
+        self.stream.flush()
@@ -0,0 +1,180 @@
+import csv
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from snake.simulation import run_batch
+from snake.solutions.base import BaseSolution
+
+
+class CandidateResult(NamedTuple):
+    params_index: int
+    params: Dict[str, Any]
+    # LAST RUNG THE CANDIDATE WAS PLAYED IN, THE ONES IN THE FINAL RUNG SURVIVED EVERY CUT
+    rung: int
+    games: int
+    perfect_rate: float
+    mean_moves: float
+    mean_score: float
+
+
+class Candidate:
+    # RUNNING TOTALS OF ONE PARAMETER SET OVER THE SEEDS PLAYED SO FAR
+    def __init__(self, params_index: int, params: Dict[str, Any]):
+        self.params_index = params_index
+        self.params = params
+        self.rung = 0
+        self.games = 0
+        self.perfect = 0
+        self.moves = 0
+        self.score = 0
+
+    def result(self) -> CandidateResult:
+        games = max(self.games, 1)
+        return CandidateResult(
+            self.params_index,
+            self.params,
+            self.rung,
+            self.games,
+            self.perfect / games,
+            self.moves / games,
+            self.score / games,
+        )
+
+
+def dominates(a: CandidateResult, b: CandidateResult) -> bool:
+    # a IS AT LEAST AS GOOD ON BOTH OBJECTIVES AND BETTER ON ONE: HIGHER PERFECT RATE, FEWER MOVES
+    return (
+        a.perfect_rate >= b.perfect_rate
+        and a.mean_moves <= b.mean_moves
+        and (a.perfect_rate > b.perfect_rate or a.mean_moves < b.mean_moves)
+    )
+
+
+def pareto_front(results: Sequence[CandidateResult]) -> List[CandidateResult]:
+    front = [a for a in results if not any(dominates(b, a) for b in results)]
+    return sorted(front, key=lambda result: (-result.perfect_rate, result.mean_moves))
+
+
+def pareto_layers(results: Sequence[CandidateResult]) -> List[List[CandidateResult]]:
+    # THE FRONT, THEN THE FRONT OF WHAT IS LEFT, AND SO ON
+    layers = []
+    remaining = list(results)
+    while remaining:
+        front = pareto_front(remaining)
+        layers.append(front)
+        indices = {result.params_index for result in front}
+        remaining = [result for result in remaining if result.params_index not in indices]
+    return layers
+
+
+def rung_sizes(n_seeds: int, min_games: int, eta: int) -> List[int]:
+    # CUMULATIVE GAMES PER CANDIDATE AT EVERY RUNG: min_games, min_games * eta, ... AND FINALLY ALL SEEDS
+    if eta < 2:
+        raise ValueError(f"eta must be at least 2, got {eta}")
+    if min_games < 1:
+        raise ValueError(f"min_games must be at least 1, got {min_games}")
+    if n_seeds < min_games:
+        raise ValueError(f"Need at least min_games = {min_games} seeds, got {n_seeds}")
+    sizes = []
+    games = min_games
+    while games < n_seeds:
+        sizes.append(games)
+        games *= eta
+    sizes.append(n_seeds)
+    return sizes
+
+
+def successive_halving(
+    solution_class: Type[BaseSolution],
+    params_list: List[Dict[str, Any]],
+    size: Tuple[int, int],
+    seeds: Sequence[int],
+    min_games: int = 4,
+    eta: int = 2,
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    verbose: bool = False,
+) -> List[CandidateResult]:
+    """
+    Plays every candidate on the first min_games seeds, keeps the best 1 / eta of them, plays the survivors on
+    eta times as many seeds and so on until the survivors have played every seed. Each rung only plays the seeds
+    that are new to it, in parallel through run_batch.
+    Candidates are ranked by Pareto layer of (perfect rate, mean moves), then by perfect rate and mean moves,
+    so every cut keeps the current front as long as it fits.
+    Returns one result per candidate, from the last rung it was played in.
+    """
+    candidates = [Candidate(index, params) for index, params in enumerate(params_list)]
+    survivors = list(candidates)
+    played = 0
+    sizes = rung_sizes(len(seeds), min_games, eta)
+
+    for rung, games in enumerate(sizes):
+        for result in run_batch(
+            solution_class,
+            [candidate.params for candidate in survivors],
+            size,
+            seeds[played:games],
+            workers=workers,
+            chunksize=chunksize,
+        ):
+            candidate = survivors[result.params_index]
+            candidate.games += 1
+            candidate.perfect += result.perfect
+            candidate.moves += result.move_count
+            candidate.score += result.score
+        played = games
+        for candidate in survivors:
+            candidate.rung = rung
+
+        if verbose:
+            print("rung {}: {} candidates on {} seeds".format(rung, len(survivors), games))
+        if rung == len(sizes) - 1:
+            break
+
+        layer_of = {}
+        for layer, layer_results in enumerate(pareto_layers([candidate.result() for candidate in survivors])):
+            for candidate_result in layer_results:
+                layer_of[candidate_result.params_index] = layer
+        survivors.sort(key=lambda c: (layer_of[c.params_index], -c.perfect / c.games, c.moves / c.games))
+        survivors = survivors[: max(1, len(survivors) // eta)]
+
+    return [candidate.result() for candidate in candidates]
+
+
+def write_results(results: Sequence[CandidateResult], path: str) -> None:
+    """
+    One row per candidate with its metrics, whether it is on the final rung's Pareto front and one column per
+    parameter. Paths ending in .parquet need pandas with a Parquet engine, anything else is written as CSV.
+    """
+    final_rung = max(result.rung for result in results)
+    front = {
+        result.params_index for result in pareto_front([result for result in results if result.rung == final_rung])
+    }
+    param_keys = sorted({key for result in results for key in result.params})
+    rows = [
+        dict(
+            {
+                "params_index": result.params_index,
+                "rung": result.rung,
+                "games": result.games,
+                "perfect_rate": result.perfect_rate,
+                "mean_moves": result.mean_moves,
+                "mean_score": result.mean_score,
+                "pareto": result.params_index in front,
+            },
+            **{key: result.params.get(key) for key in param_keys},
+        )
+        for result in results
+    ]
+
+    if path.endswith(".parquet"):
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("Writing Parquet needs pandas (and pyarrow or fastparquet), use a .csv path") from e
+        pd.DataFrame(rows).to_parquet(path)
+        return
+
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
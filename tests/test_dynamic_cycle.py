@@ -0,0 +1,18 @@
+from snake.game import SnakeGame
+from snake.solutions.dynamic_cycle import DynamicCycleSolution
+
+
+def test_next_direction_without_run():
+    game = SnakeGame(6, 6, seed=0)
+    solution = DynamicCycleSolution(game, False, 0)
+    for _ in range(50):
+        if game.make_move(solution.next_direction(game)):
+            break
+    assert game.length > 1
+
+
+def test_run_after_next_direction_starts_over():
+    game = SnakeGame(6, 6, seed=0)
+    solution = DynamicCycleSolution(game, False, 0)
+    solution.next_direction(game)
+    assert solution.run().length == game.max_length
@@ -0,0 +1,14 @@
+import pytest
+
+from snake.tuning import rung_sizes
+
+
+def test_rung_sizes():
+    assert rung_sizes(20, 4, 2) == [4, 8, 16, 20]
+    assert rung_sizes(4, 4, 3) == [4]
+
+
+@pytest.mark.parametrize("n_seeds, min_games, eta", [(8, 2, 1), (8, 2, 0), (8, 0, 2), (8, -1, 2), (3, 4, 2)])
+def test_rung_sizes_rejects_parameters_that_never_finish(n_seeds, min_games, eta):
+    with pytest.raises(ValueError):
+        rung_sizes(n_seeds, min_games, eta)